@@ -0,0 +1,211 @@
+# autopilot.py
+# Plays SnakeGame on its wrap-around board. Once the body lies along a
+# Hamiltonian cycle it follows the cycle, cutting ahead towards the food
+# while the snake is short; it never dies and fills the whole board. Until
+# then (a fresh game, or after a human steered) it uses BFS to the food
+# over the occupancy set, checking the tail stays reachable. Neighbor
+# tables, the cycle and the search buffers are built once per board size,
+# and a found path is reused until the food moves or the path is blocked,
+# so a decision is a handful of lookups.
+from collections import deque
+
+DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+# Shortcuts off the cycle stop once the snake covers this much of the board
+SHORTCUT_FILL = 0.5
+# Cells kept between the head and the tail when shortcutting
+CYCLE_MARGIN = 4
+
+class Autopilot:
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        n = cols * rows
+        self.cell_of = [(i % cols, i // cols) for i in range(n)]
+        self.index_of = {cell: i for i, cell in enumerate(self.cell_of)}
+        # neighbors[i] = ((direction, neighbor index), ...) with wrap-around
+        self.neighbors = [
+            tuple((d, ((x + d[0]) % cols) + ((y + d[1]) % rows) * cols) for d in DIRS)
+            for x, y in self.cell_of
+        ]
+
+        # Reusable search buffers: a generation stamp instead of clearing
+        self.stamp = [0] * n
+        self.gen = 0
+        self.parent = [0] * n
+        self.queue = [0] * n
+
+        self.cycle_next = self._hamiltonian_cycle()
+        # pos[i] = position of cell i along the cycle
+        self.pos = [0] * n
+        c = 0
+        for k in range(n):
+            self.pos[c] = k
+            c = self.cycle_next[c][1]
+
+        self.path = deque()
+        self.path_food = None
+        self.expected = None
+        self.on_cycle = 0
+
+    def _hamiltonian_cycle(self):
+        # Walk each row end to end, then step down; the last step down wraps
+        # back to row 0. A row walked right ends one column left of where it
+        # started and one walked left one column right, so the mix of the two
+        # is chosen to land back on (0, 0). If rows can't do it, columns can.
+        # Returns next[i] = (direction, next index).
+        cols, rows = self.cols, self.rows
+        if rows % 2 == 0 or (cols % 2 and rows >= cols):
+            lines, length, cell = rows, cols, lambda line, k: (k, line)
+        else:
+            lines, length, cell = cols, rows, lambda line, k: (line, k)
+        lefts = lines // 2 if lines % 2 == 0 else (lines - length) // 2
+        order = []
+        k = 0
+        for line in range(lines):
+            step = 1 if line % 2 == 0 or line >= 2 * lefts else -1
+            for _ in range(length):
+                order.append(cell(line, k))
+                k = (k + step) % length
+            k = (k - step) % length
+        nxt = [None] * len(order)
+        for i, a in enumerate(order):
+            b = order[(i + 1) % len(order)]
+            d = ((b[0] - a[0] + 1) % cols - 1, (b[1] - a[1] + 1) % rows - 1)
+            nxt[self.index_of[a]] = (d, self.index_of[b])
+        return nxt
+
+    def _bfs(self, start, goal, occupied):
+        # Shortest path start -> goal through free cells (goal itself may be
+        # occupied), as a deque of cell indices; None if unreachable
+        self.gen += 1
+        gen, stamp, parent, queue, cell_of = self.gen, self.stamp, self.parent, self.queue, self.cell_of
+        stamp[start] = gen
+        queue[0] = start
+        head, tail = 0, 1
+        while head < tail:
+            c = queue[head]
+            head += 1
+            if c == goal:
+                path = deque()
+                while c != start:
+                    p = parent[c]
+                    path.appendleft(c)
+                    c = p
+                return path
+            for _, nc in self.neighbors[c]:
+                if stamp[nc] != gen and (nc == goal or cell_of[nc] not in occupied):
+                    stamp[nc] = gen
+                    parent[nc] = c
+                    queue[tail] = nc
+                    tail += 1
+        return None
+
+    def _room(self, start, occupied, limit):
+        # Free cells reachable from start, counting up to limit
+        if self.cell_of[start] in occupied:
+            return 0
+        self.gen += 1
+        gen, stamp, queue, cell_of = self.gen, self.stamp, self.queue, self.cell_of
+        stamp[start] = gen
+        queue[0] = start
+        head, tail = 0, 1
+        while head < tail and tail < limit:
+            c = queue[head]
+            head += 1
+            for _, nc in self.neighbors[c]:
+                if stamp[nc] != gen and cell_of[nc] not in occupied:
+                    stamp[nc] = gen
+                    queue[tail] = nc
+                    tail += 1
+        return tail
+
+    def _safe_after(self, path, snake):
+        # Would the snake still reach its own tail after eating at the end
+        # of path? Plays the path forward on a copy of the body.
+        cell_of = self.cell_of
+        body = [cell_of[c] for c in reversed(path)] + list(snake)
+        body = body[:len(snake) + 1]
+        occupied = set(body)
+        return self._bfs(self.index_of[body[0]], self.index_of[body[-1]], occupied) is not None
+
+    def _dir_to(self, c, nc):
+        for d, n in self.neighbors[c]:
+            if n == nc:
+                return d
+        return None
+
+    def decide(self, game):
+        head = self.index_of[game.snake[0]]
+        if head != self.expected:
+            # New game, or someone else steered: the body is no longer known
+            # to lie along the cycle
+            self.on_cycle = 0
+            self.path.clear()
+        if self.on_cycle >= len(game.snake):
+            d, nc = self._cycle_move(game, head)
+            self.on_cycle += 1
+        else:
+            d, nc = self.cycle_next[head]
+            if self.cell_of[nc] in game.occupied:
+                d, nc = self._search_move(game, head)
+                self.on_cycle = 0
+            else:
+                self.on_cycle += 1
+        self.expected = nc
+        return d
+
+    def _cycle_move(self, game, head):
+        # The body lies along the cycle between tail and head, so every cell
+        # ahead of the head and behind the tail in cycle order is free. Jump
+        # ahead along the cycle towards the food, never closer than
+        # CYCLE_MARGIN to the tail, and only while the snake is short.
+        n, pos = len(self.cell_of), self.pos
+        p = pos[head]
+        tail_dist = (pos[self.index_of[game.snake[-1]]] - p) % n
+        food_dist = (pos[self.index_of[game.food]] - p) % n if game.food is not None else n
+        best = self.cycle_next[head]
+        if len(game.snake) < n * SHORTCUT_FILL:
+            best_k = 1
+            for d, nc in self.neighbors[head]:
+                k = (pos[nc] - p) % n
+                if best_k < k <= food_dist and k < tail_dist - CYCLE_MARGIN:
+                    best, best_k = (d, nc), k
+        return best
+
+    def _search_move(self, game, head):
+        occupied = game.occupied
+
+        # Keep following the cached path while it is still valid
+        if self.path and self.path_food == game.food:
+            nc = self.path[0]
+            d = self._dir_to(head, nc)
+            if d is not None and self.cell_of[nc] not in occupied:
+                self.path.popleft()
+                return d, nc
+        self.path.clear()
+
+        if game.food is not None:
+            path = self._bfs(head, self.index_of[game.food], occupied)
+            if path and self._safe_after(path, game.snake):
+                self.path, self.path_food = path, game.food
+                nc = self.path.popleft()
+                return self._dir_to(head, nc), nc
+
+        # No safe way to the food: chase the tail to buy time. Stepping
+        # straight into it counts as a collision, so it must be 2+ away.
+        path = self._bfs(head, self.index_of[game.snake[-1]], occupied)
+        if path and len(path) > 1:
+            return self._dir_to(head, path[0]), path[0]
+
+        # Boxed in: take the roomiest free neighbor
+        need = len(game.snake) + 1
+        best, best_room = self.neighbors[head][0], 0
+        for d, nc in self.neighbors[head]:
+            room = self._room(nc, occupied, need)
+            if room > best_room:
+                best, best_room = (d, nc), room
+        return best
+
+    def __call__(self, game):
+        # Usable directly as a headless input source
+        return self.decide(game)
@@ -0,0 +1,110 @@
+import random
+import numpy as np
+
+DIRS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1)], dtype=np.int64)
+
+class BatchSnakeGame:
+    # N independent boards advanced together. Mirrors SnakeGame exactly:
+    # cells are indexed row-major (y * cols + x), the free list uses the same
+    # swap-remove order and each board draws food from its own random.Random,
+    # so board i matches SnakeGame(cols, rows, cell, seed=seeds[i]).
+    def __init__(self, n, cols, rows, seeds=None):
+        if cols < 3:
+            raise ValueError(f"Board needs at least 3 columns for the starting snake, got {cols}")
+        self.n = n
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        seeds = list(seeds) if seeds is not None else [None] * n
+        self.rngs = [random.Random(s) for s in seeds]
+        self.reset()
+
+    def reset(self):
+        n, cells = self.n, self.cells
+        self.body = np.zeros((n, cells), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.occ = np.zeros((n, self.rows, self.cols), dtype=bool)
+        self.free = np.tile(np.arange(cells, dtype=np.int32), (n, 1))
+        self.free_idx = self.free.copy()
+        self.free_cnt = np.full(n, cells, dtype=np.int64)
+        self.dirs = np.tile(np.array([1, 0], dtype=np.int64), (n, 1))
+        self.food = np.full(n, -1, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.paused = np.zeros(n, dtype=bool)
+
+        everyone = np.arange(n)
+        midx, midy = self.cols // 2, self.rows // 2
+        start = [midy * self.cols + (midx - i) % self.cols for i in range(3)]
+        self.body[:, :3] = start
+        self.length[:] = 3
+        for cell in start:
+            self.occ[:, midy, cell % self.cols] = True
+            self._take_free(everyone, np.full(n, cell, dtype=np.int64))
+        self._spawn_food(everyone)
+
+    def _take_free(self, b, cell):
+        i = self.free_idx[b, cell]
+        last = self.free[b, self.free_cnt[b] - 1]
+        self.free[b, i] = last
+        self.free_idx[b, last] = i
+        self.free_cnt[b] -= 1
+
+    def _give_free(self, b, cell):
+        self.free[b, self.free_cnt[b]] = cell
+        self.free_idx[b, cell] = self.free_cnt[b]
+        self.free_cnt[b] += 1
+
+    def _push_head(self, b, cell):
+        self.head_ptr[b] = (self.head_ptr[b] - 1) % self.cells
+        self.body[b, self.head_ptr[b]] = cell
+        self.length[b] += 1
+        self.occ[b, cell // self.cols, cell % self.cols] = True
+        self._take_free(b, cell)
+
+    def _spawn_food(self, b):
+        # Only boards that just ate get here, so this loop is sparse
+        for i in b.tolist():
+            cnt = int(self.free_cnt[i])
+            self.food[i] = self.free[i, self.rngs[i].randrange(cnt)] if cnt else -1
+
+    def heads(self):
+        cell = self.body[np.arange(self.n), self.head_ptr]
+        return np.stack([cell % self.cols, cell // self.cols], axis=1)
+
+    def snake(self, i):
+        idx = (self.head_ptr[i] + np.arange(self.length[i])) % self.cells
+        cell = self.body[i, idx]
+        return [(int(c % self.cols), int(c // self.cols)) for c in cell]
+
+    def step(self, dirs=None):
+        if dirs is not None:
+            self.dirs[:] = dirs
+
+        active = np.flatnonzero(~(self.game_over | self.paused))
+        if active.size == 0:
+            return
+
+        head = self.body[active, self.head_ptr[active]]
+        nx = (head % self.cols + self.dirs[active, 0]) % self.cols
+        ny = (head // self.cols + self.dirs[active, 1]) % self.rows
+
+        hit = self.occ[active, ny, nx]
+        self.game_over[active[hit]] = True
+
+        alive = active[~hit]
+        cell = (ny * self.cols + nx)[~hit]
+        self._push_head(alive, cell)
+
+        ate = cell == self.food[alive]
+        grew = alive[ate]
+        self.score[grew] += 1
+        self._spawn_food(grew)
+
+        moved = alive[~ate]
+        tail_ptr = (self.head_ptr[moved] + self.length[moved] - 1) % self.cells
+        tail = self.body[moved, tail_ptr]
+        self.length[moved] -= 1
+        self.occ[moved, tail // self.cols, tail % self.cols] = False
+        self._give_free(moved, tail)
@@ -0,0 +1,380 @@
+# benchmarks.py
+# Micro-benchmarks for the game, tracker and render hot paths. Runs without
+# camera or display (SDL dummy drivers, synthetic frames and landmarks), so
+# it works on CI. Results can be saved as a JSON baseline and later runs
+# compared against it; a benchmark fails when its median time per call
+# grows by more than its threshold.
+#
+#   python benchmarks.py --save baseline.json
+#   python benchmarks.py --compare baseline.json --threshold 0.25
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+import pygame
+
+DEFAULT_THRESHOLD = 0.25  # allowed slowdown of the median, as a fraction
+MIN_REPEAT_TIME = 0.02    # seconds one timed repeat should last at least
+
+# Each benchmark is (name, setup, run, n): setup() runs untimed before every
+# run(), run() is timed and performs n calls of the thing being measured
+BENCHMARKS = []
+
+def benchmark(fn):
+    BENCHMARKS.append(fn)
+    return fn
+
+def measure(setup, run, n, repeat=5):
+    # Grow the number of run() calls per repeat until a repeat lasts at
+    # least MIN_REPEAT_TIME, then report per-call times over `repeat`
+    # repeats. setup() runs before every run() and is not timed.
+    def timed(loops):
+        elapsed = 0.0
+        for _ in range(loops):
+            setup()
+            t0 = time.perf_counter()
+            run()
+            elapsed += time.perf_counter() - t0
+        return elapsed
+
+    loops = 1
+    while timed(loops) < MIN_REPEAT_TIME and loops < 1 << 16:
+        loops *= 2
+    times = [timed(loops) / (loops * n) for _ in range(repeat)]
+    return {
+        "median_us": round(statistics.median(times) * 1e6, 3),
+        "min_us": round(min(times) * 1e6, 3),
+        "calls": loops * n * repeat,
+    }
+
+def nothing():
+    pass
+
+# --- synthetic inputs -------------------------------------------------------
+
+def grown_game(cols, rows, length, seed=0):
+    # SnakeGame with a snake of about `length` cells, grown by the autopilot
+    from autopilot import Autopilot
+    from game import SnakeGame
+    game = SnakeGame(cols, rows, 24, seed=seed)
+    pilot = Autopilot(cols, rows)
+    while len(game.snake) < length and not game.game_over:
+        game.dir = pilot(game)
+        game.step()
+    return game, pilot
+
+def step_trace(game, pilot, ticks):
+    # Directions for the next `ticks` steps from the game's current state,
+    # and that state so every repeat replays the same ticks
+    state = game.snapshot()
+    dirs = []
+    for _ in range(ticks):
+        if game.game_over:
+            break
+        game.dir = pilot(game)
+        dirs.append(game.dir)
+        game.step()
+    game.restore(state)
+    return state, dirs
+
+def line_game(cols, rows, length, seed=0):
+    # LargeSnakeGame with a straight snake heading right: the cells ahead of
+    # it are free for cols - length steps
+    from game import LargeSnakeGame
+    game = LargeSnakeGame(cols, rows, 24, seed=seed)
+    state = game.snapshot()
+    state["snake"] = [(length - 1 - i, rows // 2) for i in range(length)]
+    state["food"] = (cols - 1, 0)
+    game.restore(state)
+    return game
+
+def synthetic_landmarks(frames, hands=1, seed=0):
+    # (frames, hands, 21, 3) normalized landmarks drifting around the frame
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.3, 0.7, (hands, 21, 3)).astype(np.float32)
+    drift = np.cumsum(rng.normal(0, 0.004, (frames, hands, 1, 3)), axis=0).astype(np.float32)
+    return np.clip(base + drift, 0.0, 1.0)
+
+# --- game -------------------------------------------------------------------
+
+@benchmark
+def game_benchmarks():
+    for cols, rows, lengths in ((28, 21, (3, 100, 400)), (100, 100, (3, 1000, 5000))):
+        for length in lengths:
+            game, pilot = grown_game(cols, rows, length)
+            state, dirs = step_trace(game, pilot, 2000)
+
+            def setup(game=game, state=state):
+                game.restore(state)
+
+            def step(game=game, dirs=dirs):
+                for d in dirs:
+                    game.dir = d
+                    game.step()
+            yield f"game.step/{cols}x{rows}/len{length}", setup, step, len(dirs)
+
+            def spawn(game=game):
+                for _ in range(1000):
+                    game.spawn_food()
+            yield f"game.spawn_food/{cols}x{rows}/len{length}", setup, spawn, 1000
+
+    for length in (3, 500):
+        game = line_game(1000, 1000, length)
+        state = game.snapshot()
+        ticks = 400
+
+        def setup(game=game, state=state):
+            game.restore(state)
+
+        def step(game=game, ticks=ticks):
+            for _ in range(ticks):
+                game.step()
+        yield f"game.step/1000x1000-large/len{length}", setup, step, ticks
+
+        def spawn(game=game):
+            for _ in range(1000):
+                game.spawn_food()
+        yield f"game.spawn_food/1000x1000-large/len{length}", setup, spawn, 1000
+
+# --- tracker ----------------------------------------------------------------
+
+@benchmark
+def gesture_benchmarks():
+    from gestures import GestureDecoder, hand_features, CAM_W, CAM_H
+    frames = synthetic_landmarks(500)
+    features = [hand_features(f, (CAM_W, CAM_H)) for f in frames]
+    times = [i / 30 for i in range(len(features))]
+    for filt in ("ema", "one_euro"):
+        decoder = GestureDecoder(filter=filt)
+
+        def run(decoder=decoder):
+            for f, t in zip(features, times):
+                decoder.get_index_and_fingers(f, t)
+        yield f"gestures.get_index_and_fingers/{filt}", nothing, run, len(features)
+
+@benchmark
+def tracker_frame_benchmarks():
+    # The per-frame work HandTracker.update_loop does around hands.process:
+    # mirror, BGR->RGB, preview resize (pre) and the tracker's own landmark
+    # mapping, features and gesture decoding (post). No model is run.
+    import cv2
+    from frame_sources import make_synthetic_frames
+    from gestures import GestureDecoder, hand_features, CAM_W, CAM_H
+    from hand_tracker import frame_landmarks
+    frames = make_synthetic_frames(8)
+    out = np.empty_like(frames[0])
+    rgb = np.empty_like(frames[0])
+    preview = np.empty((150, 200, 3), dtype=np.uint8)
+
+    def pre():
+        for frame in frames:
+            cv2.flip(frame, 1, dst=out)
+            cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=rgb)
+            cv2.resize(rgb, (200, 150), dst=preview)
+    yield "tracker.pre", nothing, pre, len(frames)
+
+    marks = synthetic_landmarks(200, hands=2).astype(np.float64)
+    decoder = GestureDecoder()
+    box = (80, 40, 320, 320)
+
+    def post():
+        for seq, crop in enumerate(marks):
+            landmarks = frame_landmarks(crop.copy(), box, CAM_W, CAM_H)
+            features = hand_features(landmarks, (CAM_W, CAM_H))
+            decoder.decode_event(features, seq, seq / 30)
+        decoder.drain_events()
+    yield "tracker.post/2hands", nothing, post, len(marks)
+
+# --- rendering --------------------------------------------------------------
+
+@benchmark
+def render_benchmarks():
+    import main
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((main.GRID_W * main.CELL_SIZE + 260, main.GRID_H * main.CELL_SIZE))
+    cs = main.CELL_SIZE
+
+    for length in (3, 200):
+        game, pilot = grown_game(main.GRID_W, main.GRID_H, length)
+        state, dirs = step_trace(game, pilot, 300)
+        board = main.BoardRenderer(main.GRID_W, main.GRID_H, cs)
+
+        def setup(game=game, state=state, board=board):
+            game.restore(state)
+            board.redraw(game)
+
+        def update(game=game, dirs=dirs, board=board):
+            # Steps are included: update() only has work after a tick
+            for d in dirs:
+                game.dir = d
+                game.step()
+                board.update(game)
+        yield f"render.board_update/len{length}", setup, update, len(dirs)
+
+        surf = pygame.Surface((main.GRID_W * cs, main.GRID_H * cs))
+
+        def full(game=game, board=board):
+            board.redraw(game)
+        yield f"render.board_redraw/len{length}", setup, full, 1
+
+        def legacy(game=game, surf=surf):
+            main.draw_board(surf, game)
+        yield f"render.draw_board/len{length}", setup, legacy, 1
+
+    game = line_game(1000, 1000, 500)
+    state = game.snapshot()
+    chunked = main.ChunkedBoardRenderer(1000, 1000, cs, main.GRID_W, main.GRID_H)
+
+    def setup():
+        game.restore(state)
+        chunked.redraw(game)
+
+    def chunk_update():
+        for _ in range(100):
+            game.step()
+            chunked.update(game)
+    yield "render.chunked_update/1000x1000", setup, chunk_update, 100
+
+    screen = pygame.display.get_surface()
+    font_big = pygame.font.SysFont("dejavusans", 44)
+    font_med = pygame.font.SysFont("dejavusans", 20)
+    buttons = [main.Button((600 + 77 * i, 100, 65, 40), label, font_med)
+               for i, label in enumerate(("New", "Pause", "Exit"))]
+    score_rect = pygame.Rect(692, 20, 220, 64)
+
+    def panel():
+        main.draw_glow_rect(screen, score_rect, (120,255,200), glow_radius=3)
+        pygame.draw.rect(screen, (18,18,26), score_rect, border_radius=5)
+        screen.blit(main.surface_cache.text("Score: 42", font_big, (240,240,240)), (704, 38))
+        for b in buttons:
+            b.draw(screen)
+    yield "render.panel", nothing, panel, 1
+
+    def glow():
+        main.draw_glow_rect(screen, score_rect, (120,255,200), glow_radius=3)
+    yield "render.draw_glow_rect/cached", nothing, glow, 1
+
+    def glow_miss():
+        main.surface_cache.clear()
+        main.draw_glow_rect(screen, score_rect, (120,255,200), glow_radius=3)
+    yield "render.draw_glow_rect/uncached", nothing, glow_miss, 1
+
+    def neon():
+        main.neon_text(screen, "PAUSED", font_big, (256, 230), (200,240,255))
+    yield "render.neon_text/cached", nothing, neon, 1
+
+    def neon_miss():
+        main.surface_cache.clear()
+        main.neon_text(screen, "PAUSED", font_big, (256, 230), (200,240,255))
+    yield "render.neon_text/uncached", nothing, neon_miss, 1
+
+    # Preview: the tracker-side preview buffer wrapped as a surface and
+    # blitted, and the fallback conversion of a full camera frame
+    import cv2
+    from frame_sources import make_synthetic_frames
+    frame = make_synthetic_frames(1)[0]
+    preview = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), (main.PREVIEW_W, main.PREVIEW_H))
+    preview.flags.writeable = False
+    preview_buf = pygame.image.frombuffer(preview, (main.PREVIEW_W, main.PREVIEW_H), "RGB")
+    preview_surf = pygame.Surface((main.PREVIEW_W, main.PREVIEW_H))
+
+    def blit_preview():
+        screen.blit(preview_buf, (620, 300))
+    yield "render.preview_blit", nothing, blit_preview, 1
+
+    def convert_preview():
+        rgb = cv2.cvtColor(cv2.resize(frame, (main.PREVIEW_W, main.PREVIEW_H)), cv2.COLOR_BGR2RGB)
+        pygame.surfarray.blit_array(preview_surf, rgb.swapaxes(0, 1))
+        screen.blit(preview_surf, (620, 300))
+    yield "render.preview_convert", nothing, convert_preview, 1
+
+# --- running and comparing --------------------------------------------------
+
+def run_benchmarks(pattern=None, repeat=5):
+    results = {}
+    for group in BENCHMARKS:
+        for name, setup, run, n in group():
+            if pattern and pattern not in name:
+                continue
+            results[name] = measure(setup, run, n, repeat)
+            print(f"{name:<44} {results[name]['median_us']:>12.3f} us  (min {results[name]['min_us']:.3f})")
+    return results
+
+def environment():
+    import cv2
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "opencv": cv2.__version__,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+def compare(results, baseline, threshold, overrides):
+    # Thresholds: per-benchmark overrides, then the baseline's own, then the
+    # default. Returns the names of benchmarks that regressed.
+    limits = dict(baseline.get("thresholds", {}))
+    limits.update(overrides)
+    failed = []
+    for name, r in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<44} new")
+            continue
+        limit = limits.get(name, threshold)
+        change = r["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        status = "REGRESSED" if change > limit else "ok"
+        if change > limit:
+            failed.append(name)
+        print(f"{name:<44} {base['median_us']:>10.3f} -> {r['median_us']:>10.3f} us  {change:+7.1%}  "
+              f"(limit {limit:+.0%})  {status}")
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark game, tracker and render hot paths")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown of the median as a fraction (default %(default)s)")
+    parser.add_argument("--limit", action="append", default=[], metavar="NAME=FRACTION",
+                        help="per-benchmark threshold, stored in the baseline with --save")
+    args = parser.parse_args()
+
+    overrides = {}
+    for item in args.limit:
+        name, _, value = item.partition("=")
+        try:
+            overrides[name] = float(value)
+        except ValueError:
+            parser.error(f"--limit takes NAME=FRACTION, got {item}")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(args.filter, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "thresholds": overrides, "results": results},
+                      f, indent=2, sort_keys=True)
+    if baseline is not None:
+        print()
+        failed = compare(results, baseline, args.threshold, overrides)
+        if failed:
+            print(f"\n{len(failed)} benchmark(s) regressed: {', '.join(failed)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Offline evaluation of index-fingertip smoothing against recorded
+# landmark logs (see landmark_log.py). Scores lag, jitter, how many frames a
+# direction change takes to register and how many false turns a filter makes.
+import argparse
+import itertools
+import numpy as np
+from gestures import GestureDecoder, direction_intent, hand_features, landmarks_from_pixels
+from landmark_log import open_landmark_log
+
+def load_trace(path):
+    # Frames where at least one hand was tracked: timestamps and pixel
+    # landmarks of the first hand
+    records = open_landmark_log(path)
+    records = records[records["n"] > 0]
+    return np.asarray(records["t"], dtype=np.float64), np.asarray(records["pts"][:, 0], dtype=np.int64)
+
+def reference_path(xy, window=5):
+    # Zero-phase moving average: a non-causal "truth" no live filter can beat
+    pad = window // 2
+    padded = np.pad(xy, ((pad, pad), (0, 0)), mode="edge")
+    kernel = np.ones(window) / window
+    return np.stack([np.convolve(padded[:, i], kernel, mode="valid") for i in range(2)], axis=1)
+
+def run_filter(times, pts, cam_size=(640, 480), **decoder_args):
+    # Features for the whole trace at once, one "hand" per frame
+    decoder = GestureDecoder(cam_size=cam_size, **decoder_args)
+    features = hand_features(landmarks_from_pixels(pts, cam_size), cam_size)
+    out = np.empty((len(times), 2))
+    for i, t in enumerate(times):
+        pos, _ = decoder.get_index_and_fingers(features, float(t), hand=i)
+        out[i] = pos
+    return out
+
+def intents(xy, center):
+    return [direction_intent((x, y), 1, center) for x, y in xy]
+
+def score(times, raw, filtered, cam_size=(640, 480), moving_speed=200.0, still_speed=30.0, max_shift=15):
+    ref = reference_path(raw)
+    dt = np.diff(times)
+    frame_dt = float(np.median(dt)) if len(dt) else 1 / 30
+    speed = np.zeros(len(ref))
+    if len(ref) > 1:
+        speed[1:] = np.linalg.norm(np.diff(ref, axis=0), axis=1) / np.maximum(dt, 1e-6)
+
+    # Lag: the shift that best aligns the filter with the reference while moving
+    moving = np.flatnonzero(speed > moving_speed)
+    errors = []
+    for k in range(max_shift + 1):
+        idx = moving[moving >= k]
+        errors.append(np.mean(np.sum((filtered[idx] - ref[idx - k]) ** 2, axis=1)) if len(idx) else np.inf)
+    lag_frames = int(np.argmin(errors)) if moving.size else 0
+
+    # Jitter: RMS frame-to-frame motion of the output while the hand is still
+    still = np.flatnonzero(speed[1:] < still_speed) + 1
+    steps = np.linalg.norm(filtered[still] - filtered[still - 1], axis=1) if still.size else np.zeros(1)
+    jitter = float(np.sqrt(np.mean(steps ** 2)))
+
+    # Direction changes: frames until the filter agrees with a new reference
+    # direction, and turns the reference never made
+    center = (cam_size[0] // 2, cam_size[1] // 2)
+    ref_dir, out_dir = intents(ref, center), intents(filtered, center)
+    delays, false_turns = [], 0
+    for i in range(1, len(ref_dir)):
+        if ref_dir[i] is not None and ref_dir[i] != ref_dir[i - 1]:
+            d = next((j - i for j in range(i, min(i + 30, len(out_dir))) if out_dir[j] == ref_dir[i]), 30)
+            delays.append(d)
+        if out_dir[i] is not None and out_dir[i] != out_dir[i - 1]:
+            nearby = ref_dir[max(0, i - 2):i + 3]
+            if out_dir[i] not in nearby:
+                false_turns += 1
+
+    return {
+        "lag_ms": round(1000 * lag_frames * frame_dt, 1),
+        "jitter_px": round(jitter, 2),
+        "turn_frames": round(float(np.mean(delays)), 2) if delays else 0.0,
+        "false_turns": false_turns,
+    }
+
+def default_configs():
+    configs = [("ema alpha=0.4", {"filter": "ema", "smoothing_alpha": 0.4})]
+    for mc, beta in itertools.product((0.5, 1.0, 2.0), (0.005, 0.01, 0.03)):
+        configs.append((f"one_euro mc={mc} beta={beta}",
+                        {"filter": "one_euro", "min_cutoff": (mc, mc), "beta": (beta, beta)}))
+    return configs
+
+def main():
+    parser = argparse.ArgumentParser(description="Score index-finger smoothing filters on landmark logs")
+    parser.add_argument("logs", nargs="+", help="landmark logs written with main.py --record")
+    args = parser.parse_args()
+
+    traces = [load_trace(path) for path in args.logs]
+    print(f"{'filter':<32}{'lag ms':>8}{'jitter px':>11}{'turn frames':>13}{'false turns':>13}")
+    for name, cfg in default_configs():
+        results = [score(t, pts[:, 8].astype(float), run_filter(t, pts, **cfg)) for t, pts in traces if len(t)]
+        if not results:
+            break
+        avg = {k: np.mean([r[k] for r in results]) for k in results[0]}
+        print(f"{name:<32}{avg['lag_ms']:>8.1f}{avg['jitter_px']:>11.2f}"
+              f"{avg['turn_frames']:>13.2f}{avg['false_turns']:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Frame sources for HandTracker. All of them follow the cv2.VideoCapture
+# read()/release() contract so the tracker does not care where frames come from.
+# paced=True delivers frames at the source fps, paced=False as fast as possible.
+import abc
+import glob
+import os
+import time
+import cv2
+import numpy as np
+from gestures import CAM_W, CAM_H
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class FrameSource(abc.ABC):
+    # Subclasses provide _grab() (next BGR frame, or None at the end) and
+    # _rewind() (back to the first frame, for loop=True)
+    def __init__(self, fps=30.0, paced=True, loop=False, size=None):
+        self.fps = fps
+        self.paced = paced
+        self.loop = loop
+        self.size = size
+        self.eof = False
+        self.frames_read = 0
+        self.timestamp = None
+        self._next_t = None
+
+    @abc.abstractmethod
+    def _grab(self):
+        ...
+
+    @abc.abstractmethod
+    def _rewind(self):
+        ...
+
+    def _pace(self):
+        if not self.paced or not self.fps:
+            return
+        now = time.perf_counter()
+        if self._next_t is None:
+            self._next_t = now
+        elif self._next_t > now:
+            time.sleep(self._next_t - now)
+        self._next_t = max(self._next_t, now - 1.0 / self.fps) + 1.0 / self.fps
+
+    def read(self):
+        if self.eof:
+            return False, None
+        self._pace()
+        frame = self._grab()
+        if frame is None and self.loop and self.frames_read:
+            self._rewind()
+            frame = self._grab()
+        if frame is None:
+            self.eof = True
+            return False, None
+        if self.size is not None and (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        self.frames_read += 1
+        self.timestamp = time.perf_counter()
+        return True, frame
+
+    def release(self):
+        pass
+
+class WebcamSource(FrameSource):
+    # The camera paces itself, so no software pacing here
+    def __init__(self, index=0, width=CAM_W, height=CAM_H):
+        super().__init__(fps=None, paced=False)
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Keep the driver queue short so we never read stale frames
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def _grab(self):
+        success, frame = self.cap.read()
+        return frame if success else None
+
+    def _rewind(self):
+        pass  # a live camera has nothing to rewind
+
+    def read(self):
+        # A failed camera read is not the end of the stream
+        frame = self._grab()
+        if frame is None:
+            return False, None
+        self.frames_read += 1
+        self.timestamp = time.perf_counter()
+        return True, frame
+
+    def release(self):
+        self.cap.release()
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path, paced=True, loop=False, size=None, fps=None):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video file: {path}")
+        super().__init__(fps=fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0,
+                         paced=paced, loop=loop, size=size)
+
+    def _grab(self):
+        success, frame = self.cap.read()
+        return frame if success else None
+
+    def _rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        self.cap.release()
+
+class ImageSequenceSource(FrameSource):
+    # Images are decoded up front so disk I/O does not show up in timings
+    def __init__(self, directory, fps=30.0, paced=True, loop=False, size=None):
+        super().__init__(fps=fps, paced=paced, loop=loop, size=size)
+        paths = sorted(p for p in glob.glob(os.path.join(directory, "*"))
+                       if p.lower().endswith(IMAGE_EXTS))
+        if not paths:
+            raise IOError(f"No images found in: {directory}")
+        self.frames = []
+        for p in paths:
+            frame = cv2.imread(p)
+            if frame is None:
+                raise IOError(f"Cannot read image: {p}")
+            self.frames.append(frame)
+        self.pos = 0
+
+    def _grab(self):
+        if self.pos >= len(self.frames):
+            return None
+        frame = self.frames[self.pos]
+        self.pos += 1
+        return frame
+
+    def _rewind(self):
+        self.pos = 0
+
+class SyntheticSource(ImageSequenceSource):
+    # In-memory BGR frames; defaults to a single moving-gradient clip
+    def __init__(self, frames=None, fps=30.0, paced=True, loop=True, size=None, count=60):
+        FrameSource.__init__(self, fps=fps, paced=paced, loop=loop, size=size)
+        self.frames = list(frames) if frames is not None else make_synthetic_frames(count)
+        self.pos = 0
+
+def make_synthetic_frames(count=60, width=CAM_W, height=CAM_H):
+    ramp = np.linspace(0, 255, width, dtype=np.float32)
+    frames = []
+    for i in range(count):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:] = ((ramp + i * 255.0 / count) % 256).astype(np.uint8)[None, :, None]
+        frames.append(frame)
+    return frames
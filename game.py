@@ -1,26 +1,94 @@
 # game.py
 import random
+from collections import deque
 
 class SnakeGame:
-    def __init__(self, cols, rows, cell_size):
+    def __init__(self, cols, rows, cell_size, rng=None, seed=None):
+        # Food placement uses the game's own RNG: rng if given, otherwise a
+        # random.Random(seed). Without a seed one is drawn and kept in
+        # self.seed, so any session can be reproduced.
+        if cols < 3:
+            raise ValueError(f"Board needs at least 3 columns for the starting snake, got {cols}")
         self.cols = cols
         self.rows = rows
         self.cell = cell_size
+        if rng is None and seed is None:
+            seed = random.randrange(1 << 32)
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
         self.reset()
 
     def reset(self):
         midx = self.cols // 2
         midy = self.rows // 2
-        self.snake = [(midx, midy), (midx-1, midy), (midx-2, midy)]
+        # Wrapped like every other move, so narrow boards stay on the grid
+        self.snake = deque([((midx - i) % self.cols, midy) for i in range(3)])
+
+        self._init_free()
+        for cell in self.snake:
+            self._occupy(cell)
+
         self.dir = (1, 0)
         self.spawn_food()
         self.score = 0
         self.game_over = False
         self.paused = False
 
+    def _init_free(self):
+        # Occupancy index + free-cell list with position map (swap-remove),
+        # so collisions and food sampling never scan the body or the board
+        self.occupied = set()
+        self.free = [(x, y) for y in range(self.rows) for x in range(self.cols)]
+        self.free_idx = {cell: i for i, cell in enumerate(self.free)}
+
+    def _occupy(self, cell):
+        self.occupied.add(cell)
+        i = self.free_idx.pop(cell)
+        last = self.free.pop()
+        if last != cell:
+            self.free[i] = last
+            self.free_idx[last] = i
+
+    def _release(self, cell):
+        self.occupied.discard(cell)
+        self.free_idx[cell] = len(self.free)
+        self.free.append(cell)
+
     def spawn_food(self):
-        free = [(x, y) for x in range(self.cols) for y in range(self.rows) if (x, y) not in self.snake]
-        self.food = random.choice(free) if free else None
+        self.food = self.rng.choice(self.free) if self.free else None
+
+    def snapshot(self):
+        # Everything later ticks depend on, as plain data (see session_log)
+        return {
+            "snake": list(self.snake),
+            "dir": self.dir,
+            "food": self.food,
+            "score": self.score,
+            "game_over": self.game_over,
+            "paused": self.paused,
+            "rng": self.rng.getstate(),
+            "free": self._free_state(),
+        }
+
+    def restore(self, state):
+        self.snake = deque(tuple(c) for c in state["snake"])
+        self.occupied = set(self.snake)
+        self._restore_free(state["free"])
+        self.dir = tuple(state["dir"])
+        self.food = tuple(state["food"]) if state["food"] is not None else None
+        self.score = state["score"]
+        self.game_over = state["game_over"]
+        self.paused = state["paused"]
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+
+    def _free_state(self):
+        # The free list order decides where food lands, so it is saved as is
+        return [y * self.cols + x for x, y in self.free]
+
+    def _restore_free(self, free):
+        self.free = [(i % self.cols, i // self.cols) for i in free]
+        self.free_idx = {cell: i for i, cell in enumerate(self.free)}
 
     def step(self):
         if self.game_over or self.paused:
@@ -33,14 +101,163 @@ class SnakeGame:
         # Wrap around
         new_head = (new_head[0] % self.cols, new_head[1] % self.rows)
 
-        if new_head in self.snake:
+        if new_head in self.occupied:
             self.game_over = True
             return
 
-        self.snake.insert(0, new_head)
+        self.snake.appendleft(new_head)
+        self._occupy(new_head)
 
         if self.food and new_head == self.food:
             self.score += 1
             self.spawn_food()
         else:
-            self.snake.pop()
\ No newline at end of file
+            self._release(self.snake.pop())
+
+class LargeSnakeGame(SnakeGame):
+    # SnakeGame for boards too big for a free-cell list (1000x1000 and up).
+    # Only the occupancy set is kept and food is placed by rejection
+    # sampling, so memory and reset time follow the snake, not the board.
+    # A nearly full board falls back to one scan for free cells.
+    MAX_TRIES = 64
+
+    def _init_free(self):
+        self.occupied = set()
+
+    def _occupy(self, cell):
+        self.occupied.add(cell)
+
+    def _release(self, cell):
+        self.occupied.discard(cell)
+
+    def _free_state(self):
+        return None
+
+    def _restore_free(self, free):
+        pass
+
+    def spawn_food(self):
+        for _ in range(self.MAX_TRIES):
+            cell = (self.rng.randrange(self.cols), self.rng.randrange(self.rows))
+            if cell not in self.occupied:
+                self.food = cell
+                return
+        free = [(x, y) for y in range(self.rows) for x in range(self.cols) if (x, y) not in self.occupied]
+        self.food = self.rng.choice(free) if free else None
+
+class Snake:
+    def __init__(self, pid, body, direction):
+        self.pid = pid
+        self.body = deque(body)
+        self.dir = direction
+        self.score = 0
+        self.alive = True
+
+class MultiSnakeGame(SnakeGame):
+    # Several snakes on one board, one per player id. All snakes share the
+    # occupancy set and free-cell list, so a tick costs O(number of snakes)
+    # whatever their lengths. Snakes move simultaneously; a head entering
+    # any occupied cell (tails included, as in SnakeGame) or meeting another
+    # head dies and its body is cleared from the board.
+    def reset(self):
+        self.snakes = {}
+        self._init_free()
+        self.spawn_food()
+        self.game_over = False
+        self.paused = False
+
+    @property
+    def score(self):
+        return sum(s.score for s in self.snakes.values())
+
+    def add_snake(self, pid):
+        # Spawn a 3-cell snake heading right on the row nearest the middle
+        # with room for it and a few cells ahead
+        if pid in self.snakes:
+            return self.snakes[pid]
+        midx, midy = self.cols // 2, self.rows // 2
+        rows = sorted(range(self.rows), key=lambda y: abs(y - midy))
+        # Prefer rows with a free row on either side, then any row
+        for margin in (1, 0):
+            for y in rows:
+                area = [((midx - i) % self.cols, (y + dy) % self.rows)
+                        for i in range(-3, 3) for dy in range(-margin, margin + 1)]
+                if any(c in self.occupied for c in area):
+                    continue
+                snake = Snake(pid, [(midx - i, y) for i in range(3)], (1, 0))
+                for cell in snake.body:
+                    self._occupy(cell)
+                if self.food in self.occupied:
+                    self.spawn_food()
+                self.snakes[pid] = snake
+                return snake
+        return None
+
+    def claim_snake(self, pid, max_snakes, active=()):
+        # Snake for player pid: a new one while there are fewer than
+        # max_snakes, otherwise the slot of a dead snake or of a player not
+        # in active (a hand that came back under a new id). None if every
+        # slot is taken by an active player.
+        if pid in self.snakes:
+            return self.snakes[pid]
+        if len(self.snakes) < max_snakes:
+            return self.add_snake(pid)
+        dead = [p for p, s in self.snakes.items() if not s.alive]
+        orphaned = [p for p in self.snakes if p not in active]
+        if dead:
+            del self.snakes[dead[0]]
+            return self.add_snake(pid)
+        if orphaned:
+            snake = self.snakes.pop(orphaned[0])
+            snake.pid = pid
+            self.snakes[pid] = snake
+            return snake
+        return None
+
+    def remove_snake(self, pid):
+        snake = self.snakes.pop(pid, None)
+        if snake is not None:
+            self._kill(snake)
+
+    def _kill(self, snake):
+        snake.alive = False
+        for cell in snake.body:
+            self._release(cell)
+        snake.body.clear()
+
+    def step(self):
+        if self.game_over or self.paused:
+            return
+
+        moves = {}
+        targets = {}
+        for pid, snake in self.snakes.items():
+            if not snake.alive:
+                continue
+            head = snake.body[0]
+            new_head = ((head[0] + snake.dir[0]) % self.cols, (head[1] + snake.dir[1]) % self.rows)
+            moves[pid] = new_head
+            targets[new_head] = targets.get(new_head, 0) + 1
+
+        # Collisions are judged against the board before anyone moves
+        dead = [pid for pid, cell in moves.items() if cell in self.occupied or targets[cell] > 1]
+        for pid in dead:
+            del moves[pid]
+
+        ate = False
+        for pid, new_head in moves.items():
+            snake = self.snakes[pid]
+            snake.body.appendleft(new_head)
+            self._occupy(new_head)
+            if self.food and new_head == self.food:
+                snake.score += 1
+                ate = True
+            else:
+                self._release(snake.body.pop())
+
+        for pid in dead:
+            self._kill(self.snakes[pid])
+        if ate or self.food is None:
+            self.spawn_food()
+
+        self.game_over = bool(self.snakes) and not any(s.alive for s in self.snakes.values())
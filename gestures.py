@@ -0,0 +1,290 @@
+# gestures.py
+# Index-finger smoothing and finger counting shared by every tracker
+# (live, replay, ...). Needs only NumPy, not OpenCV/MediaPipe.
+import asyncio
+import math
+import queue
+import time
+from collections import namedtuple
+import numpy as np
+
+# Camera frame size every tracker reports hand pixels in
+CAM_W, CAM_H = 640, 480
+
+TIPS = np.array([8, 12, 16, 20])
+PIPS = np.array([6, 10, 14, 18])
+
+# Per-hand arrays for all hands in a frame (first axis = hand):
+# fingers (n, 4) bool, finger_count (n,), index_tip (n, 2) px, index_z (n,),
+# pinch (n,) thumb-index distance / palm size, index_angle (n,) radians of
+# the index MCP -> tip vector, palm_size (n,) px, palm_center (n, 2) px
+# (midpoint of wrist and middle MCP)
+HandFeatures = namedtuple("HandFeatures", "fingers finger_count index_tip index_z pinch index_angle palm_size palm_center")
+
+def hand_features(landmarks, cam_size, margin_px=5):
+    # landmarks: (n, 21, 3) normalized x, y, z
+    px = landmarks[:, :, :2] * np.asarray(cam_size, dtype=np.float32)
+    fingers = px[:, TIPS, 1] < px[:, PIPS, 1] - margin_px
+    palm = np.linalg.norm(px[:, 9] - px[:, 0], axis=-1)
+    pinch = np.linalg.norm(px[:, 4] - px[:, 8], axis=-1) / np.maximum(palm, 1e-6)
+    v = px[:, 8] - px[:, 5]
+    return HandFeatures(
+        fingers=fingers,
+        finger_count=fingers.sum(axis=1),
+        index_tip=px[:, 8],
+        index_z=landmarks[:, 8, 2],
+        pinch=pinch,
+        index_angle=np.arctan2(v[:, 1], v[:, 0]),
+        palm_size=palm,
+        palm_center=(px[:, 0] + px[:, 9]) / 2,
+    )
+
+def landmarks_from_pixels(pts, cam_size):
+    # (n, 21, 2) pixel coords -> (n, 21, 3) normalized array (z unknown = 0)
+    landmarks = np.zeros((len(pts), 21, 3), dtype=np.float32)
+    landmarks[:, :, :2] = pts
+    landmarks[:, :, :2] /= np.asarray(cam_size, dtype=np.float32)
+    return landmarks
+
+# One decoded frame: wall time, frame seq, smoothed index tip, fingers up and
+# the direction the gesture asks for (None = no change). In multi-hand mode
+# there is one event per hand per frame, player being the hand's stable id;
+# a frame without hands gets a single event with player None.
+GestureEvent = namedtuple("GestureEvent", "t seq index_pos fingers direction player", defaults=(0,))
+
+def direction_intent(index_pos, fingers, center, threshold=30):
+    # Only 1 finger up = control; point away from the center to turn
+    if index_pos is None or fingers != 1:
+        return None
+    dx = index_pos[0] - center[0]
+    dy = index_pos[1] - center[1]
+    if abs(dx) <= threshold and abs(dy) <= threshold:
+        return None
+    if abs(dx) > abs(dy):
+        return (-1, 0) if dx < 0 else (1, 0)
+    return (0, -1) if dy < 0 else (0, 1)
+
+class GestureStream:
+    # Thread-safe event queue filled by the tracker thread. When full the
+    # oldest event is dropped. Asyncio consumers can subscribe() from inside
+    # their loop and get events pushed via call_soon_threadsafe.
+    def __init__(self, maxsize=256):
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+        self.subscribers = []
+
+    def publish(self, event):
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                break
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+        for loop, aq in list(self.subscribers):
+            try:
+                loop.call_soon_threadsafe(aq.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's loop has closed; this runs on the tracker
+                # thread, so drop the subscriber rather than raise
+                self.unsubscribe(aq)
+
+    def drain(self):
+        events = []
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def subscribe(self):
+        aq = asyncio.Queue()
+        self.subscribers.append((asyncio.get_running_loop(), aq))
+        return aq
+
+    def unsubscribe(self, aq):
+        self.subscribers = [s for s in self.subscribers if s[1] is not aq]
+
+    async def events(self):
+        aq = self.subscribe()
+        try:
+            while True:
+                yield await aq.get()
+        finally:
+            self.unsubscribe(aq)
+
+class OneEuroFilter:
+    # Speed-adaptive low-pass filter (Casiez et al., "1 Euro Filter"): heavy
+    # smoothing when the signal is still, little lag when it moves fast.
+    # min_cutoff in Hz, beta scales the cutoff with speed (units/s).
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x_prev = None
+        self.dx_prev = 0.0
+        self.t_prev = None
+
+    @staticmethod
+    def smoothing_factor(dt, cutoff):
+        r = 2 * math.pi * cutoff * dt
+        return r / (r + 1)
+
+    def __call__(self, x, t):
+        if self.t_prev is None:
+            self.x_prev, self.t_prev = x, t
+            return x
+        dt = t - self.t_prev
+        if dt < 0:
+            # Clock went backwards (e.g. a looping replay): start over
+            self.reset()
+            return self(x, t)
+        if dt == 0:
+            return self.x_prev
+        dx = (x - self.x_prev) / dt
+        a_d = self.smoothing_factor(dt, self.d_cutoff)
+        dx_hat = a_d * dx + (1 - a_d) * self.dx_prev
+        cutoff = self.min_cutoff + self.beta * abs(dx_hat)
+        a = self.smoothing_factor(dt, cutoff)
+        x_hat = a * x + (1 - a) * self.x_prev
+        self.x_prev, self.dx_prev, self.t_prev = x_hat, dx_hat, t
+        return x_hat
+
+class GestureDecoder:
+    # filter="ema" keeps the original fixed-alpha EMA with a 5 px deadzone;
+    # filter="one_euro" uses a timestamped OneEuroFilter per axis, tuned
+    # with (x, y) pairs for min_cutoff and beta. multi_hand=True decodes
+    # every hand (see MultiHandDecoder) and publishes per-player events.
+    def __init__(self, smoothing_alpha=0.4, cam_size=(CAM_W, CAM_H), filter="ema",
+                 min_cutoff=(1.0, 1.0), beta=(0.01, 0.01), d_cutoff=1.0, multi_hand=False):
+        self.cam_size = cam_size
+        self.gestures = GestureStream()
+        self.smooth_index_pos = None
+        self.alpha = smoothing_alpha
+        self.last_index_pos = None
+        self.prev_index_pos = None
+
+        if filter not in ("ema", "one_euro"):
+            raise ValueError(f"Unknown filter: {filter}")
+        self.filter = filter
+        self.euro = [OneEuroFilter(min_cutoff[i], beta[i], d_cutoff) for i in range(2)]
+        self.hand_decoder = MultiHandDecoder(
+            cam_size, smoothing_alpha=smoothing_alpha, filter=filter,
+            min_cutoff=min_cutoff, beta=beta, d_cutoff=d_cutoff) if multi_hand else None
+
+    def get_index_and_fingers(self, features, t=None, hand=0):
+        # features: HandFeatures for the frame; hand picks which one steers
+        if len(features.finger_count) <= hand:
+            return None, None
+
+        ix, iy = features.index_tip[hand].tolist()  # Index fingertip
+
+        if self.filter == "one_euro":
+            if t is None:
+                t = time.perf_counter()
+            self.smooth_index_pos = (self.euro[0](ix, t), self.euro[1](iy, t))
+        # Improved smoothing with deadzone
+        elif self.smooth_index_pos is None:
+            self.smooth_index_pos = (ix, iy)
+        else:
+            sx, sy = self.smooth_index_pos
+            if abs(ix - sx) > 5 or abs(iy - sy) > 5:
+                sx = self.alpha * ix + (1 - self.alpha) * sx
+                sy = self.alpha * iy + (1 - self.alpha) * sy
+                self.smooth_index_pos = (sx, sy)
+
+        # Fingers up (tip above its PIP joint) come from hand_features
+        fingers_count = int(features.finger_count[hand])
+
+        return (int(self.smooth_index_pos[0]), int(self.smooth_index_pos[1])), fingers_count
+
+    def decode_event(self, features, seq, t=None):
+        # t is the frame timestamp used by the one_euro filter
+        if self.hand_decoder is not None:
+            return self.decode_players(features, seq, t)
+        index_pos, fingers = self.get_index_and_fingers(features, t)
+        center = (self.cam_size[0] // 2, self.cam_size[1] // 2)
+        event = GestureEvent(time.time(), seq, index_pos, fingers, direction_intent(index_pos, fingers, center))
+        self.gestures.publish(event)
+        return event
+
+    def decode_players(self, features, seq, t=None):
+        now = time.time()
+        events = [GestureEvent(now, seq, index_pos, fingers, direction, pid)
+                  for pid, index_pos, fingers, direction in self.hand_decoder.decode(features, t)]
+        if not events:
+            events = [GestureEvent(now, seq, None, None, None, None)]
+        for event in events:
+            self.gestures.publish(event)
+        return events
+
+    def drain_events(self):
+        return self.gestures.drain()
+
+class HandMatcher:
+    # Gives each tracked hand a stable id across frames by greedily matching
+    # palm centers (wrist + middle MCP) to the previous frame's hands. Ids of
+    # hands unseen for max_missing frames are retired.
+    def __init__(self, max_dist=120, max_missing=15):
+        self.max_dist = max_dist
+        self.max_missing = max_missing
+        self.tracks = {}  # id -> [center, frames missing]
+        self.next_id = 0
+
+    def match(self, centers):
+        # centers: palm centers in px, one per hand -> stable id per hand
+        centers = [tuple(c) for c in np.asarray(centers).tolist()]
+        ids = [None] * len(centers)
+        pairs = sorted(
+            (math.dist(c, track[0]), i, tid)
+            for i, c in enumerate(centers) for tid, track in self.tracks.items()
+        )
+        used = set()
+        for dist, i, tid in pairs:
+            if dist > self.max_dist:
+                break
+            if ids[i] is None and tid not in used:
+                ids[i] = tid
+                used.add(tid)
+        for i, c in enumerate(centers):
+            if ids[i] is None:
+                ids[i] = self.next_id
+                self.next_id += 1
+            self.tracks[ids[i]] = [c, 0]
+        for tid in list(self.tracks):
+            if tid not in ids:
+                self.tracks[tid][1] += 1
+                if self.tracks[tid][1] > self.max_missing:
+                    del self.tracks[tid]
+        return ids
+
+class MultiHandDecoder:
+    # Per-hand gesture decoding for multi-player mode: each stable hand id
+    # gets its own GestureDecoder (and so its own smoothing state)
+    def __init__(self, cam_size=(CAM_W, CAM_H), **decoder_args):
+        self.cam_size = cam_size
+        self.decoder_args = decoder_args
+        self.matcher = HandMatcher()
+        self.decoders = {}
+
+    def decode(self, features, t=None):
+        # [(hand id, index_pos, fingers, direction), ...] from a frame's
+        # HandFeatures
+        center = (self.cam_size[0] // 2, self.cam_size[1] // 2)
+        out = []
+        for i, pid in enumerate(self.matcher.match(features.palm_center)):
+            decoder = self.decoders.get(pid)
+            if decoder is None:
+                decoder = self.decoders[pid] = GestureDecoder(cam_size=self.cam_size, **self.decoder_args)
+            index_pos, fingers = decoder.get_index_and_fingers(features, t, hand=i)
+            out.append((pid, index_pos, fingers, direction_intent(index_pos, fingers, center)))
+        for pid in list(self.decoders):
+            if pid not in self.matcher.tracks:
+                del self.decoders[pid]
+        return out
@@ -1,16 +1,103 @@
 # hand_tracker.py
 import cv2
 import mediapipe as mp
+import numpy as np
 import threading
 import time
+from frame_sources import WebcamSource, CAM_W, CAM_H
+from gestures import GestureDecoder, hand_features
+from landmark_log import LandmarkRecorder
+from telemetry import Telemetry
 
-CAM_W, CAM_H = 640, 480
+class Mailbox:
+    # One-slot hand-off between pipeline stages: put() never blocks and
+    # overwrites an item nobody has taken yet (counted in dropped).
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.item = None
+        self.full = False
+        self.closed = False
+        self.dropped = 0
 
-class HandTracker:
-    def __init__(self, maxHands=1, detectionCon=0.7, smoothing_alpha=0.4):
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAM_W)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAM_H)
+    def put(self, item):
+        with self.cond:
+            if self.full:
+                self.dropped += 1
+            self.item = item
+            self.full = True
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        with self.cond:
+            self.cond.wait_for(lambda: self.full or self.closed, timeout)
+            if not self.full:
+                return None
+            item, self.item, self.full = self.item, None, False
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+MIN_ROI = 96
+
+# Sparse optical flow used between full inferences in adaptive mode
+LK_PARAMS = dict(winSize=(21, 21), maxLevel=3,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+
+def readonly_views(arrays):
+    views = [a.view() for a in arrays]
+    for view in views:
+        view.flags.writeable = False
+    return views
+
+def roi_from_points(xs, ys, frame_w, frame_h, padding):
+    # Square box around the points, padded by a fraction of its size and
+    # clipped to the frame
+    x0, x1 = float(np.min(xs)), float(np.max(xs))
+    y0, y1 = float(np.min(ys)), float(np.max(ys))
+    side = max(x1 - x0, y1 - y0) * (1 + 2 * padding)
+    side = int(min(max(side, MIN_ROI), frame_w, frame_h))
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    rx = int(min(max(cx - side / 2, 0), frame_w - side))
+    ry = int(min(max(cy - side / 2, 0), frame_h - side))
+    return rx, ry, side, side
+
+def box_holds(box, xs, ys, frame_w, frame_h, margin):
+    # True when every point lies inside box shrunk by margin (a fraction of
+    # its size) on each side that is not on the frame edge
+    if box is None:
+        return False
+    rx, ry, rw, rh = box
+    mx, my = rw * margin, rh * margin
+    x0 = rx + mx if rx > 0 else 0
+    y0 = ry + my if ry > 0 else 0
+    x1 = rx + rw - mx if rx + rw < frame_w else frame_w
+    y1 = ry + rh - my if ry + rh < frame_h else frame_h
+    return bool(np.min(xs) >= x0 and np.max(xs) <= x1 and np.min(ys) >= y0 and np.max(ys) <= y1)
+
+def frame_landmarks(buf, box, frame_w, frame_h):
+    # Landmarks normalized to the crop box (x, y, w, h) -> read-only float32
+    # landmarks normalized to the full frame. buf is mapped in place.
+    rx, ry, rw, rh = box
+    buf[:, :, 0] *= rw / frame_w
+    buf[:, :, 0] += rx / frame_w
+    buf[:, :, 1] *= rh / frame_h
+    buf[:, :, 1] += ry / frame_h
+    landmarks = buf.astype(np.float32)
+    landmarks.flags.writeable = False
+    return landmarks
+
+class HandTracker(GestureDecoder):
+    def __init__(self, maxHands=1, detectionCon=0.7, smoothing_alpha=0.4, source=None, record_path=None,
+                 roi=False, roi_padding=0.3, infer_size=None, telemetry=None, preview_size=None,
+                 adaptive=False, keyframe_interval=4, idle_fps=5.0, max_fb_error=1.0,
+                 min_tracked=0.8, max_flow_px=40.0, **filter_args):
+        # filter_args (filter, min_cutoff, beta, d_cutoff) go to GestureDecoder
+        GestureDecoder.__init__(self, smoothing_alpha, (CAM_W, CAM_H), **filter_args)
+        # Any frame_sources.FrameSource (or cv2.VideoCapture-like object)
+        self.cap = source if source is not None else WebcamSource(0, CAM_W, CAM_H)
 
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
@@ -20,74 +107,308 @@ class HandTracker:
             min_tracking_confidence=0.7
         )
 
-        self.frame = None
-        self.hands_data = None
+        # Per-stage timings (capture, queue, mirror, color, process, post)
+        self.telemetry = telemetry if telemetry is not None else Telemetry()
+
+        # ROI mode: run inference on a padded crop around the previous frame's
+        # hands, falling back to the full frame when tracking is lost.
+        # infer_size caps the longest side of the image given to MediaPipe.
+        self.roi = roi
+        self.roi_padding = roi_padding
+        self.infer_size = infer_size
+        self.roi_box = None
+        # MediaPipe's tracking mode carries its own hand box from one image to
+        # the next, which only holds while the image covers the same area, so
+        # the model is reset whenever the area it is given changes. The ROI
+        # only moves once the hand leaves the inner part of the crop, which
+        # keeps those resets (each one costs a palm detection) rare.
+        self.model_box = None
+
+        # Adaptive mode: MediaPipe runs on every keyframe_interval-th frame and
+        # the landmarks are carried through the frames in between with
+        # optical flow. A point counts as tracked when LK finds it forward and
+        # back again within max_fb_error px of where it started; a full
+        # inference is forced when fewer than min_tracked of the points are
+        # tracked or the median point moves more than max_flow_px. With no
+        # hand in view, or while the consumer has called set_idle(True),
+        # frames are only taken at idle_fps; the rest are dropped unpublished.
+        self.adaptive = adaptive
+        self.keyframe_interval = keyframe_interval
+        self.idle_fps = idle_fps
+        self.max_fb_error = max_fb_error
+        self.min_tracked = min_tracked
+        self.max_flow_px = max_flow_px
+        self.idle = False
+        self.hands_seen = False
+        self.flow_pts = None
+        self.frames_since_key = 0
+        self.last_infer_t = 0.0
+        self.gray = None
+        self.frames_inferred = 0
+        self.frames_propagated = 0
+        self.frames_throttled = 0
+
+        # Optional landmark log for LandmarkReplayTracker
+        self.recorder = LandmarkRecorder(record_path, maxHands, (CAM_W, CAM_H)) if record_path else None
+
+        # Scratch buffer for (hands, 21, [x, y, z]) normalized landmarks
+        self.max_hands = maxHands
+        self.lm_buf = np.empty((maxHands, 21, 3), dtype=np.float64)
+
+        # Triple buffer: the worker flips each frame straight into a slot that
+        # is neither published nor held by the reader, then publishes it with
+        # a sequence number. Readers get a read-only view, no copies.
+        self.slots = None
+        self.views = None
+        # Optional preview-sized RGB copy made on the worker thread from the
+        # RGB frame MediaPipe already needs, triple-buffered like the frame
+        self.preview_size = preview_size
+        self.preview_slots = None
+        self.preview_views = None
+        self.rgb_frame = None
+        self.published = None
+        self.reading = None
+        self.seq = 0
+        self.landmarks = np.zeros((0, 21, 3), dtype=np.float32)
+        self.features = hand_features(self.landmarks, (CAM_W, CAM_H))
         self.lock = threading.Lock()
+
+        # Capture and inference run on separate threads joined by a one-slot
+        # mailbox, so inference always picks up the freshest camera frame
+        self.mailbox = Mailbox()
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.frames_unread = 0
+        self.last_read_seq = 0
+
         self.running = True
+        self.capture_thread = threading.Thread(target=self.capture_loop, daemon=True)
         self.thread = threading.Thread(target=self.update_loop, daemon=True)
+        self.capture_thread.start()
         self.thread.start()
 
-        self.smooth_index_pos = None
-        self.alpha = smoothing_alpha
-        self.last_index_pos = None
-        self.prev_index_pos = None
-
-    def update_loop(self):
+    def capture_loop(self):
+        tel = self.telemetry
         while self.running:
+            t0 = time.perf_counter()
             success, frame = self.cap.read()
             if not success:
+                if getattr(self.cap, "eof", False):
+                    break
                 continue
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb_frame)
+            t_captured = tel.lap("capture", t0)
+            self.frames_captured += 1
+            self.mailbox.put((frame, t_captured))
+        self.mailbox.close()
 
-            hands_list = []
-            if results.multi_hand_landmarks:
-                for handLms in results.multi_hand_landmarks:
-                    lmList = [(int(lm.x * CAM_W), int(lm.y * CAM_H)) for lm in handLms.landmark]
-                    hands_list.append({"lmList": lmList})
+    def update_loop(self):
+        tel = self.telemetry
+        while self.running:
+            item = self.mailbox.get(timeout=0.1)
+            if item is None:
+                if self.mailbox.closed:
+                    break
+                continue
+            frame, t_captured = item
+            t = tel.lap("queue", t_captured)
+            if self.adaptive and self._throttled():
+                continue
+            if self.slots is None or self.slots[0].shape != frame.shape:
+                self._alloc_buffers(frame.shape)
+            with self.lock:
+                slot = next(i for i in range(3) if i != self.published and i != self.reading)
+            out = self.slots[slot]
+            cv2.flip(frame, 1, dst=out)
+            t = tel.lap("mirror", t)
+            cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+            t = tel.lap("color", t)
+            if self.preview_size is not None:
+                cv2.resize(self.rgb_frame, self.preview_size, dst=self.preview_slots[slot])
+                tel.lap("preview", t)
+            landmarks = self._schedule(self.rgb_frame) if self.adaptive else self._infer(self.rgb_frame)
+            t = time.perf_counter()
+            features = hand_features(landmarks, (CAM_W, CAM_H))
+            tel.lap("features", t)
+
+            if self.recorder is not None:
+                self.recorder.write(time.time(), landmarks)
 
             with self.lock:
-                self.frame = frame.copy()
-                self.hands_data = hands_list
+                self.published = slot
+                self.landmarks = landmarks
+                self.features = features
+                self.seq += 1
+                seq = self.seq
+            self.frames_processed += 1
 
-    def read_frame(self):
-        with self.lock:
-            return self.frame.copy() if self.frame is not None else None, self.hands_data.copy() if self.hands_data is not None else []
+            # Decode gestures here, at camera rate, so none are missed
+            # between game ticks
+            t = time.perf_counter()
+            self.decode_event(features, seq, t_captured)
+            tel.lap("gesture", t)
 
-    def get_index_and_fingers(self, hands):
-        if not hands:
-            return None, None
+    def _infer(self, rgb_frame):
+        fh, fw = rgb_frame.shape[:2]
+        rx, ry, rw, rh = self.roi_box if self.roi and self.roi_box else (0, 0, fw, fh)
+        image = rgb_frame[ry:ry + rh, rx:rx + rw]
+        if self.infer_size and max(rw, rh) > self.infer_size:
+            scale = self.infer_size / max(rw, rh)
+            image = cv2.resize(image, (max(1, int(rw * scale)), max(1, int(rh * scale))),
+                               interpolation=cv2.INTER_AREA)
+        elif rw != fw or rh != fh:
+            image = np.ascontiguousarray(image)
+        if self.model_box is not None and self.model_box != (rx, ry, rw, rh):
+            self.hands.reset()
+        self.model_box = (rx, ry, rw, rh)
+        t = time.perf_counter()
+        results = self.hands.process(image)
+        t = self.telemetry.lap("process", t)
 
-        hand = hands[0]
-        lmList = hand["lmList"]
-        ix, iy = lmList[8]  # Index fingertip
+        # Landmarks come back normalized to the crop; map them to the full
+        # frame in one go
+        hands_found = results.multi_hand_landmarks or []
+        n = min(len(hands_found), self.max_hands)
+        buf = self.lm_buf[:n]
+        for h in range(n):
+            buf[h] = [(lm.x, lm.y, lm.z) for lm in hands_found[h].landmark]
+        out = self._outputs(buf, (rx, ry, rw, rh), fw, fh)
+        self.telemetry.lap("post", t)
+        return out
 
-        # Improved smoothing with deadzone
-        if self.smooth_index_pos is None:
-            self.smooth_index_pos = (ix, iy)
-        else:
-            sx, sy = self.smooth_index_pos
-            if abs(ix - sx) > 5 or abs(iy - sy) > 5:
-                sx = self.alpha * ix + (1 - self.alpha) * sx
-                sy = self.alpha * iy + (1 - self.alpha) * sy
-                self.smooth_index_pos = (sx, sy)
-
-        # Finger up detection: tip higher than PIP joint
-        tips = [8, 12, 16, 20]
-        pips = [6, 10, 14, 18]
-        fingers = []
-        for tip, pip in zip(tips, pips):
-            if lmList[tip][1] < lmList[pip][1] - 5:  # stricter
-                fingers.append(1)
+    def _outputs(self, buf, box, fw, fh):
+        # Full-frame landmarks from ones normalized to box; also moves the ROI
+        landmarks = frame_landmarks(buf, box, fw, fh)
+        if self.roi:
+            if not len(buf):
+                self.roi_box = None
             else:
-                fingers.append(0)
-        fingers_count = sum(fingers)
+                xs, ys = buf[:, :, 0].ravel() * fw, buf[:, :, 1].ravel() * fh
+                if not box_holds(self.roi_box, xs, ys, fw, fh, self.roi_padding / 2):
+                    self.roi_box = roi_from_points(xs, ys, fw, fh, self.roi_padding)
+        return landmarks
+
+    def set_idle(self, idle):
+        # The consumer has nothing to steer (paused, game over): infer at idle_fps
+        self.idle = idle
+
+    def _throttled(self):
+        # Adaptive mode: drop the frame outright while idle or handless, up
+        # to idle_fps; nothing is published, so seq only moves on new results
+        idle = self.idle or not self.hands_seen
+        if idle and time.perf_counter() - self.last_infer_t < 1.0 / self.idle_fps:
+            self.flow_pts = None
+            self.frames_throttled += 1
+            return True
+        return False
+
+    def _schedule(self, rgb_frame):
+        # Adaptive mode: full inference or optical-flow propagation
+        now = time.perf_counter()
+        fh, fw = rgb_frame.shape[:2]
+        prev_gray, gray = self.gray
+        cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY, dst=gray)
+        self.gray = [gray, prev_gray]
+        if self.flow_pts is not None and self.frames_since_key + 1 < self.keyframe_interval:
+            t = time.perf_counter()
+            pts, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, self.flow_pts, None, **LK_PARAMS)
+            back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, prev_gray, pts, None, **LK_PARAMS)
+            fb_error = np.linalg.norm(back - self.flow_pts, axis=2)
+            tracked = (status == 1) & (back_status == 1) & (fb_error <= self.max_fb_error)
+            motion = np.median(np.linalg.norm(pts - self.flow_pts, axis=2))
+            if tracked.mean() >= self.min_tracked and motion <= self.max_flow_px:
+                self.flow_pts = pts
+                self.frames_since_key += 1
+                self.frames_propagated += 1
+                # x, y from the flow; z stays as last detected
+                buf = self.lm_buf[:len(pts) // 21]
+                buf[:, :, :2] = pts.reshape(-1, 21, 2) / (fw, fh)
+                out = self._outputs(buf, (0, 0, fw, fh), fw, fh)
+                self.telemetry.lap("flow", t)
+                return out
+
+        landmarks = self._infer(rgb_frame)
+        self.last_infer_t = now
+        self.frames_since_key = 0
+        self.frames_inferred += 1
+        self.hands_seen = len(landmarks) > 0
+        if len(landmarks):
+            pts = landmarks[:, :, :2] * np.array((fw, fh), dtype=np.float32)
+            self.flow_pts = pts.reshape(-1, 1, 2)
+        else:
+            self.flow_pts = None
+        return landmarks
+
+    def _alloc_buffers(self, shape):
+        with self.lock:
+            self.slots = [np.empty(shape, dtype=np.uint8) for _ in range(3)]
+            self.views = readonly_views(self.slots)
+            if self.preview_size is not None:
+                pw, ph = self.preview_size
+                self.preview_slots = [np.empty((ph, pw, 3), dtype=np.uint8) for _ in range(3)]
+                self.preview_views = readonly_views(self.preview_slots)
+            self.rgb_frame = np.empty(shape, dtype=np.uint8)
+            self.gray = [np.empty(shape[:2], dtype=np.uint8) for _ in range(2)]
+            self.published = None
+            self.reading = None
+
+    def read_latest(self):
+        # (seq, frame, landmarks). frame is a read-only view that stays valid
+        # until the next read; landmarks is the read-only (hands, 21, 3) array
+        # from read_hands(). seq only changes when a new frame has been
+        # published.
+        with self.lock:
+            if self.published is None:
+                return self.seq, None, self.landmarks
+            self.reading = self.published
+            if self.seq > self.last_read_seq:
+                self.frames_unread += self.seq - self.last_read_seq - 1
+                self.last_read_seq = self.seq
+            return self.seq, self.views[self.reading], self.landmarks
+
+    def read_frame(self):
+        _, frame, landmarks = self.read_latest()
+        return frame, landmarks
+
+    def read_hands(self):
+        # (seq, landmarks, features) for the frame last published:
+        # landmarks is a read-only float32 (hands, 21, 3) array of normalized
+        # x, y and z; features is a gestures.HandFeatures for all hands
+        with self.lock:
+            return self.seq, self.landmarks, self.features
+
+    def preview(self):
+        # RGB preview of the frame returned by the last read_latest(), or None
+        with self.lock:
+            if self.preview_views is None or self.reading is None:
+                return None
+            return self.preview_views[self.reading]
+
+    def drop_stats(self):
+        # capture_dropped: camera frames replaced before inference took them
+        # inference_dropped: results replaced before the consumer read them
+        return {
+            "captured": self.frames_captured,
+            "capture_dropped": self.mailbox.dropped,
+            "processed": self.frames_processed,
+            "inference_dropped": self.frames_unread,
+        }
 
-        return (int(self.smooth_index_pos[0]), int(self.smooth_index_pos[1])), fingers_count
+    def schedule_stats(self):
+        # Adaptive mode: frames run through MediaPipe, carried by optical
+        # flow, and skipped by the idle throttle
+        return {
+            "inferred": self.frames_inferred,
+            "propagated": self.frames_propagated,
+            "throttled": self.frames_throttled,
+        }
 
     def release(self):
         self.running = False
+        self.mailbox.close()
+        self.capture_thread.join()
         self.thread.join()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.hands.close()
         self.cap.release()
         cv2.destroyAllWindows()
\ No newline at end of file
@@ -0,0 +1,133 @@
+# Headless game loop: no window, camera or audio. Drives SnakeGame from a
+# scripted, recorded or autopilot input source as fast as possible and reports ticks/s.
+import argparse
+import os
+import random
+import time
+from game import SnakeGame
+
+DIR_CODES = {"R": (1, 0), "L": (-1, 0), "U": (0, -1), "D": (0, 1), ".": None}
+
+def apply_dir(game, new_dir):
+    # Same rule as main.py: ignore direct reversals
+    if new_dir is not None and new_dir != (-game.dir[0], -game.dir[1]):
+        game.dir = new_dir
+
+class ScriptedInput:
+    # Replays a sequence of directions, one per tick (None = no change)
+    def __init__(self, dirs, loop=True):
+        self.dirs = list(dirs)
+        self.loop = loop
+        self.i = 0
+
+    def __call__(self, game):
+        if not self.dirs or (not self.loop and self.i >= len(self.dirs)):
+            return None
+        d = self.dirs[self.i % len(self.dirs)]
+        self.i += 1
+        return d
+
+class RandomInput:
+    # Random turns that avoid walking straight into the body when possible
+    def __init__(self, seed=None, turn_prob=0.2):
+        self.rng = random.Random(seed)
+        self.turn_prob = turn_prob
+
+    def __call__(self, game):
+        hx, hy = game.snake[0]
+        safe = [d for d in DIR_CODES.values() if d is not None and
+                ((hx + d[0]) % game.cols, (hy + d[1]) % game.rows) not in game.occupied]
+        if not safe:
+            return None
+        if game.dir in safe and self.rng.random() >= self.turn_prob:
+            return None
+        return self.rng.choice(safe)
+
+def load_recorded_input(path, loop=False):
+    # One character per tick: R/L/U/D or '.' for no change; whitespace ignored
+    with open(path) as f:
+        codes = [c for c in f.read() if not c.isspace()]
+    return ScriptedInput([DIR_CODES[c.upper()] for c in codes], loop=loop)
+
+def run_headless(game, source, ticks, render=False, restart=True, recorder=None):
+    # recorder: optional session_log.SessionRecorder logging every tick
+    surf = None
+    if render:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+        from render import draw_board
+        surf = pygame.Surface((game.cols * game.cell, game.rows * game.cell))
+
+    sim = recorder if recorder is not None else game
+    games = 1
+    done = 0
+    t0 = time.perf_counter()
+    while done < ticks:
+        if game.game_over:
+            if not restart:
+                break
+            sim.reset()
+            games += 1
+        apply_dir(game, source(game))
+        sim.step()
+        if surf is not None:
+            draw_board(surf, game)
+        done += 1
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "ticks": done,
+        "seconds": elapsed,
+        "ticks_per_s": done / elapsed if elapsed > 0 else float("inf"),
+        "games": games,
+        "score": game.score,
+        "length": len(game.snake),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run SnakeGame without display, camera or audio")
+    parser.add_argument("--ticks", type=int, default=100000)
+    parser.add_argument("--cols", type=int, default=28)
+    parser.add_argument("--rows", type=int, default=21)
+    parser.add_argument("--cell", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--input", help="recorded input file (R/L/U/D/. per tick); default is random turns")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="steer with autopilot.Autopilot; games run until the board is full")
+    parser.add_argument("--record-session", help="log the run as a session_log file")
+    parser.add_argument("--session", help="re-simulate a session_log file at full speed instead")
+    parser.add_argument("--render", action="store_true", help="also draw each tick to an off-screen surface")
+    parser.add_argument("--no-restart", action="store_true", help="stop at the first game over")
+    args = parser.parse_args()
+    if args.cols < 3:
+        parser.error("--cols must be at least 3")
+
+    if args.session:
+        from session_log import SessionReplayer
+        stats = SessionReplayer(args.session, args.cell).run()
+        check = {True: "snapshots match", False: "SNAPSHOTS DIFFER", None: "no snapshot to check"}
+        print(f"{stats['ticks']} ticks in {stats['seconds']:.3f}s = {stats['ticks_per_s']:.0f} ticks/s "
+              f"({stats['games']} games, last score {stats['score']}, {check[stats['matches']]})")
+        return
+
+    game = SnakeGame(args.cols, args.rows, args.cell, seed=args.seed)
+    if args.autopilot:
+        from autopilot import Autopilot
+        source = Autopilot(args.cols, args.rows)
+    elif args.input:
+        source = load_recorded_input(args.input)
+    else:
+        source = RandomInput(args.seed)
+    recorder = None
+    if args.record_session:
+        from session_log import SessionRecorder
+        recorder = SessionRecorder(game, args.record_session)
+    stats = run_headless(game, source, args.ticks, render=args.render, restart=not args.no_restart,
+                         recorder=recorder)
+    if recorder is not None:
+        recorder.close()
+    print(f"{stats['ticks']} ticks in {stats['seconds']:.3f}s = {stats['ticks_per_s']:.0f} ticks/s "
+          f"({stats['games']} games, last score {stats['score']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# landmark_log.py
+# Fixed-stride binary log of per-frame landmarks (pixel x, y of every hand
+# HandTracker publishes) and a replay tracker that memory-maps it. Replay
+# needs only NumPy: no OpenCV, MediaPipe or camera.
+import os
+import struct
+import time
+import numpy as np
+from gestures import GestureDecoder, hand_features, landmarks_from_pixels
+
+MAGIC = b"LMK1"
+HEADER = struct.Struct("<4sHH8x")  # magic, landmarks per hand, max hands
+NUM_LANDMARKS = 21
+
+def record_dtype(max_hands):
+    return np.dtype([
+        ("t", "<f8"),
+        ("n", "<u2"),
+        ("pts", "<i2", (max_hands, NUM_LANDMARKS, 2)),
+    ])
+
+class LandmarkRecorder:
+    def __init__(self, path, max_hands=1, cam_size=(640, 480)):
+        self.path = path
+        self.max_hands = max_hands
+        self.cam_size = np.asarray(cam_size, dtype=np.float32)
+        self.rec = np.zeros(1, dtype=record_dtype(max_hands))
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, NUM_LANDMARKS, max_hands))
+        self.count = 0
+
+    def write(self, timestamp, landmarks):
+        # landmarks: (hands, 21, 3) normalized, stored as whole pixels
+        rec = self.rec[0]
+        n = min(len(landmarks), self.max_hands)
+        rec["t"] = timestamp
+        rec["n"] = n
+        rec["pts"] = 0
+        rec["pts"][:n] = landmarks[:n, :, :2] * self.cam_size
+        self.f.write(self.rec.tobytes())
+        self.count += 1
+
+    def close(self):
+        if not self.f.closed:
+            self.f.close()
+
+def open_landmark_log(path):
+    with open(path, "rb") as f:
+        magic, num_landmarks, max_hands = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or num_landmarks != NUM_LANDMARKS:
+        raise ValueError(f"Not a landmark log: {path}")
+    dtype = record_dtype(max_hands)
+    if os.path.getsize(path) < HEADER.size + dtype.itemsize:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size)
+
+class LandmarkReplayTracker(GestureDecoder):
+    # Drop-in for HandTracker in main.py's control logic. Each read_frame()
+    # serves the next record; with paced=True it follows the recorded timing.
+    def __init__(self, path, smoothing_alpha=0.4, paced=False, loop=False, frame_size=(640, 480),
+                 preview_size=None, **filter_args):
+        GestureDecoder.__init__(self, smoothing_alpha, frame_size, **filter_args)
+        self.records = open_landmark_log(path)
+        self.times = self.records["t"]
+        self.paced = paced
+        self.loop = loop
+        self.pos = 0
+        self.eof = len(self.records) == 0
+        self.start_wall = None
+        self.seq = 0
+        self.last_pos = None
+        self.landmarks = np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.features = hand_features(self.landmarks, frame_size)
+        # Blank frame so callers that expect an image keep working
+        self.frame = np.zeros((frame_size[1], frame_size[0], 3), dtype=np.uint8)
+        self.frame.flags.writeable = False
+        self.preview_frame = None
+        if preview_size is not None:
+            self.preview_frame = np.zeros((preview_size[1], preview_size[0], 3), dtype=np.uint8)
+            self.preview_frame.flags.writeable = False
+
+    def __len__(self):
+        return len(self.records)
+
+    def _advance(self):
+        if self.paced:
+            if self.start_wall is None:
+                self.start_wall = time.perf_counter()
+            elapsed = time.perf_counter() - self.start_wall
+            # Latest record whose timestamp has already "happened"
+            pos = int(np.searchsorted(self.times, self.times[0] + elapsed, side="right")) - 1
+            if pos >= len(self.records) - 1 and self.loop:
+                self.start_wall = time.perf_counter()
+            self.eof = pos >= len(self.records) - 1 and not self.loop
+            return max(pos, 0)
+        pos = self.pos
+        self.pos += 1
+        if self.pos >= len(self.records):
+            if self.loop:
+                self.pos = 0
+            else:
+                self.pos = len(self.records) - 1
+                self.eof = True
+        return pos
+
+    def landmarks_at(self, i):
+        rec = self.records[i]
+        return landmarks_from_pixels(rec["pts"][:rec["n"]], self.cam_size)
+
+    def read_latest(self):
+        if len(self.records) == 0:
+            return 0, self.frame, self.landmarks
+        pos = self._advance()
+        if pos != self.last_pos or (self.loop and not self.paced):
+            self.seq += 1
+            self.landmarks = self.landmarks_at(pos)
+            self.features = hand_features(self.landmarks, self.cam_size)
+            # No worker thread here: decode each newly served record
+            self.decode_event(self.features, self.seq, float(self.times[pos]))
+        self.last_pos = pos
+        return self.seq, self.frame, self.landmarks
+
+    def read_frame(self):
+        _, frame, landmarks = self.read_latest()
+        return frame, landmarks
+
+    def read_hands(self):
+        # Same shape as HandTracker.read_hands(); z is not recorded
+        return self.seq, self.landmarks, self.features
+
+    def preview(self):
+        return self.preview_frame
+
+    def release(self):
+        # Drop the memmap so the file mapping is closed
+        self.records = self.times = np.zeros(0, dtype=self.records.dtype)
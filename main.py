@@ -1,14 +1,27 @@
 # main.py
+import time
+START = time.perf_counter()
+import argparse
+import functools
+import itertools
+from collections import deque
 import pygame
-import cv2
 import numpy as np
-from game import SnakeGame
-from hand_tracker import HandTracker, CAM_W, CAM_H
+from game import SnakeGame, MultiSnakeGame, LargeSnakeGame
+from autopilot import Autopilot
+from telemetry import Telemetry
+from gestures import CAM_W, CAM_H
+from warmup import BackgroundTracker
+from surface_cache import SurfaceCache
+from session_log import SessionRecorder
+from render import draw_board
 
 CELL_SIZE = 24
 GRID_W = 28
 GRID_H = 21
-FPS = 3 
+GAME_SPEED = 3      # snake ticks per second
+FPS = 60            # input sampling / render rate
+MAX_CATCHUP = 5     # ticks run at most per frame after a stall
 PREVIEW_W, PREVIEW_H = 200, 150
 
 # Colors
@@ -21,34 +34,338 @@ BLUE = (70,120,255)
 YELLOW = (255,230,100)
 NEON_PINK = (255,64,200)
 
-# Sound generator
-def make_sound(freq=440, duration_ms=120, volume=0.2, sample_rate=44100):
+# Sound generator; the synthesized samples are cached per tone
+@functools.lru_cache(maxsize=None)
+def tone_buffer(freq=440, duration_ms=120, volume=0.2, sample_rate=44100):
     t = np.linspace(0, duration_ms / 1000, int(sample_rate * duration_ms / 1000), False)
     wave = 0.5 * np.sin(2 * np.pi * freq * t)
-    audio = np.int16(wave * 32767 * volume)
-    sound = pygame.mixer.Sound(buffer=audio.tobytes())
-    return sound
+    return np.int16(wave * 32767 * volume).tobytes()
 
-glow_cache = {}
+def make_sound(freq=440, duration_ms=120, volume=0.2, sample_rate=44100):
+    return pygame.mixer.Sound(buffer=tone_buffer(freq, duration_ms, volume, sample_rate))
+
+# Tracker factories for BackgroundTracker: cv2 and mediapipe are imported
+# on the loader thread, not before the window opens
+def hand_tracker_factory(**kwargs):
+    def build(telemetry):
+        from hand_tracker import HandTracker
+        return HandTracker(telemetry=telemetry, **kwargs)
+    return build
+
+def process_tracker_factory(**kwargs):
+    def build(telemetry):
+        from process_tracker import ProcessHandTracker
+        return ProcessHandTracker(telemetry=telemetry, **kwargs)
+    return build
+
+def replay_tracker_factory(path, **kwargs):
+    def build(telemetry):
+        from landmark_log import LandmarkReplayTracker
+        return LandmarkReplayTracker(path, **kwargs)
+    return build
+
+# Rendered text, glows and panels shared by all UI drawing
+surface_cache = SurfaceCache(maxsize=256)
 
 def draw_glow_rect(surface, rect, color, glow_radius=8):
-    key = (rect[2], rect[3], color)
-    if key not in glow_cache:
-        w, h = rect[2], rect[3]
+    w, h = rect[2], rect[3]
+    def make():
         glow = pygame.Surface((w + glow_radius*2, h + glow_radius*2), pygame.SRCALPHA)
         for i in range(glow_radius, 0, -1):
             alpha = int(10 + (i / glow_radius) * 40)
             pygame.draw.rect(glow, (*color, alpha), (glow_radius - i, glow_radius - i, w + 2*i, h + 2*i), border_radius=8)
-        glow_cache[key] = glow
-    surface.blit(glow_cache[key], (rect[0]-glow_radius, rect[1]-glow_radius), special_flags=pygame.BLEND_ADD)
+        return glow
+    glow = surface_cache.get(("glow", w, h, color, glow_radius), make)
+    surface.blit(glow, (rect[0]-glow_radius, rect[1]-glow_radius), special_flags=pygame.BLEND_ADD)
 
 def neon_text(surface, text, font, pos, neon_color, outline=3):
-    x, y = pos
-    for dx, dy in [(-outline,0),(outline,0),(0,-outline),(0,outline)]:
-        img = font.render(text, True, (10,10,10))
-        surface.blit(img, (x+dx, y+dy))
-    txt = font.render(text, True, neon_color)
-    surface.blit(txt, (x, y))
+    img = surface_cache.outlined_text(text, font, neon_color, outline)
+    surface.blit(img, (pos[0] - outline, pos[1] - outline))
+
+# (head, body) colors per player; player 0 keeps the classic look
+PLAYER_COLORS = [
+    ((120,200,255), (80,255,140)),
+    ((255,200,120), (255,140,80)),
+    ((220,140,255), (170,90,255)),
+    ((255,255,160), (230,230,60)),
+]
+
+def paint_cell(surface, r, kind, player=0):
+    inner = r.inflate(-4, -4)
+    head_color, body_color = PLAYER_COLORS[player % len(PLAYER_COLORS)]
+    if kind == "food":
+        pygame.draw.rect(surface, RED, inner, border_radius=6)
+    elif kind == "head":
+        pygame.draw.rect(surface, head_color, inner, border_radius=6)
+        pygame.draw.rect(surface, (230,230,255,30), inner, border_radius=6)
+    else:
+        pygame.draw.rect(surface, body_color, inner, border_radius=6)
+
+class BoardRenderer:
+    # Persistent board surface over a pre-rendered grid. update() redraws
+    # only the cells that changed since the last call (new heads, old heads,
+    # removed tails, food) and returns their rects in board coordinates.
+    # Works with SnakeGame and MultiSnakeGame.
+    def __init__(self, cols, rows, cs):
+        self.cols, self.rows, self.cs = cols, rows, cs
+        self.background = pygame.Surface((cols*cs, rows*cs))
+        self.background.fill((10,10,14))
+        for x in range(cols):
+            pygame.draw.line(self.background, (18,18,26), (x*cs, 0), (x*cs, rows*cs))
+        for y in range(rows):
+            pygame.draw.line(self.background, (18,18,26), (0, y*cs), (cols*cs, y*cs))
+        self.surface = self.background.copy()
+        self.refs = {}
+        self.drawn = {}
+        self.food = None
+
+    @staticmethod
+    def bodies(game):
+        snakes = getattr(game, "snakes", None)
+        if snakes is None:
+            return {0: game.snake}
+        return {pid: s.body for pid, s in snakes.items()}
+
+    def cell_rect(self, cell):
+        return pygame.Rect(cell[0]*self.cs, cell[1]*self.cs, self.cs, self.cs)
+
+    def erase(self, cell):
+        r = self.cell_rect(cell)
+        self.surface.blit(self.background, r, r)
+        return r
+
+    def draw_cell(self, cell, kind, player=0):
+        r = self.erase(cell)
+        paint_cell(self.surface, r, kind, player)
+        return r
+
+    def redraw(self, game):
+        self.surface.blit(self.background, (0, 0))
+        self.refs = self.bodies(game)
+        self.drawn = {key: deque(body) for key, body in self.refs.items()}
+        self.food = game.food
+        if game.food:
+            self.draw_cell(game.food, "food")
+        for key, body in self.refs.items():
+            for i, cell in enumerate(body):
+                self.draw_cell(cell, "head" if i == 0 else "body", key)
+        return [self.surface.get_rect()]
+
+    def update(self, game):
+        current = self.bodies(game)
+        dirty = []
+        draws = []
+
+        # reset() swaps in new deques: erase whatever they replaced
+        for key in list(self.drawn):
+            if current.get(key) is not self.refs[key]:
+                dirty.extend(self.erase(cell) for cell in self.drawn.pop(key))
+                del self.refs[key]
+
+        # All erasing happens before any drawing so a cell vacated by one
+        # snake and entered by another ends up drawn
+        for key, body in current.items():
+            drawn = self.drawn.get(key)
+            if drawn:
+                old_head = drawn[0]
+                grown = next((i for i in range(min(len(body), MAX_CATCHUP + 1)) if body[i] == old_head), None)
+                popped = len(drawn) + grown - len(body) if grown is not None else -1
+                if 0 <= popped <= len(drawn):
+                    for _ in range(popped):
+                        dirty.append(self.erase(drawn.pop()))
+                    if grown:
+                        for i in range(grown - 1, -1, -1):
+                            drawn.appendleft(body[i])
+                            draws.append((body[i], "head" if i == 0 else "body", key))
+                        draws.append((old_head, "body", key))
+                    continue
+                dirty.extend(self.erase(cell) for cell in drawn)
+            self.refs[key] = body
+            self.drawn[key] = deque(body)
+            draws.extend((cell, "head" if i == 0 else "body", key) for i, cell in enumerate(body))
+
+        if self.food != game.food:
+            if self.food and self.food not in game.occupied:
+                dirty.append(self.erase(self.food))
+            if game.food:
+                draws.append((game.food, "food", 0))
+            self.food = game.food
+
+        for cell, kind, key in draws:
+            dirty.append(self.draw_cell(cell, kind, key))
+        return dirty
+
+class ChunkedBoardRenderer(BoardRenderer):
+    # BoardRenderer for boards far larger than the window. The board is cut
+    # into chunk x chunk tiles rendered on demand and kept in a small LRU;
+    # cell changes are painted into tiles that are cached and only recorded
+    # for the rest. surface is a view_cols x view_rows window centered on
+    # the (first) head, wrapping like the board, with a minimap in the
+    # corner. Memory and per-frame cost follow the viewport and the snake,
+    # not the board; update() returns the whole view rect when it changed.
+    def __init__(self, cols, rows, cs, view_cols, view_rows, chunk=16, minimap=120):
+        self.cols, self.rows, self.cs = cols, rows, cs
+        self.view_cols, self.view_rows = view_cols, view_rows
+        self.chunk = chunk
+        self.tile = pygame.Surface((chunk*cs, chunk*cs))
+        self.tile.fill((10,10,14))
+        for i in range(chunk):
+            pygame.draw.line(self.tile, (18,18,26), (i*cs, 0), (i*cs, chunk*cs))
+            pygame.draw.line(self.tile, (18,18,26), (0, i*cs), (chunk*cs, i*cs))
+        visible = (view_cols // chunk + 2) * (view_rows // chunk + 2)
+        self.chunks = SurfaceCache(maxsize=2 * visible)
+        self.surface = pygame.Surface((view_cols*cs, view_rows*cs))
+
+        # Minimap: snake cells per minimap pixel, so a pixel clears only
+        # when the last cell in it is released
+        mw = min(cols, minimap)
+        mh = max(1, min(rows, minimap * rows // cols))
+        self.mini_counts = np.zeros((mw, mh), dtype=np.int32)
+        self.mini_palette = np.array([(10,10,14), PLAYER_COLORS[0][1]], dtype=np.uint8)
+        self.minimap = pygame.Surface((mw, mh))
+
+        self.cells = {}  # cell -> (kind, player) for everything on the board
+        self.refs = {}
+        self.drawn = {}
+        self.food = None
+        self.center = None
+        self.changed = True
+
+    def _chunk_of(self, cell):
+        return cell[0] // self.chunk, cell[1] // self.chunk
+
+    def _local_rect(self, cell):
+        ch, cs = self.chunk, self.cs
+        return pygame.Rect((cell[0] % ch) * cs, (cell[1] % ch) * cs, cs, cs)
+
+    def _mini_add(self, cell, n):
+        mw, mh = self.mini_counts.shape
+        self.mini_counts[cell[0] * mw // self.cols, cell[1] * mh // self.rows] += n
+
+    def _render_chunk(self, cx, cy):
+        ch, cs = self.chunk, self.cs
+        w, h = min(ch, self.cols - cx*ch), min(ch, self.rows - cy*ch)
+        surf = pygame.Surface((w*cs, h*cs))
+        surf.blit(self.tile, (0, 0))
+        cells = self.cells
+        for y in range(cy*ch, cy*ch + h):
+            for x in range(cx*ch, cx*ch + w):
+                what = cells.get((x, y))
+                if what is not None:
+                    paint_cell(surf, self._local_rect((x, y)), *what)
+        return surf
+
+    def erase(self, cell):
+        what = self.cells.pop(cell, None)
+        if what is not None and what[0] != "food":
+            self._mini_add(cell, -1)
+        chunk = self.chunks.items.get(self._chunk_of(cell))
+        if chunk is not None:
+            r = self._local_rect(cell)
+            chunk.blit(self.tile, r, r)
+        self.changed = True
+        return self.cell_rect(cell)
+
+    def draw_cell(self, cell, kind, player=0):
+        r = self.erase(cell)
+        self.cells[cell] = (kind, player)
+        if kind != "food":
+            self._mini_add(cell, 1)
+        chunk = self.chunks.items.get(self._chunk_of(cell))
+        if chunk is not None:
+            paint_cell(chunk, self._local_rect(cell), kind, player)
+        return r
+
+    def focus(self, game):
+        for body in self.bodies(game).values():
+            if body:
+                return body[0]
+        return self.center or (self.cols // 2, self.rows // 2)
+
+    def render_view(self):
+        # Blit the visible parts of each tile, walking the board modulo its
+        # size so the view wraps like the game does
+        ch, cs = self.chunk, self.cs
+        x0 = self.center[0] - self.view_cols // 2
+        y0 = self.center[1] - self.view_rows // 2
+        y = y0
+        while y < y0 + self.view_rows:
+            wy = y % self.rows
+            cy = wy // ch
+            h = min((cy + 1) * ch, self.rows, wy + y0 + self.view_rows - y) - wy
+            x = x0
+            while x < x0 + self.view_cols:
+                wx = x % self.cols
+                cx = wx // ch
+                w = min((cx + 1) * ch, self.cols, wx + x0 + self.view_cols - x) - wx
+                tile = self.chunks.get((cx, cy), lambda: self._render_chunk(cx, cy))
+                self.surface.blit(tile, ((x - x0) * cs, (y - y0) * cs),
+                                  ((wx - cx*ch) * cs, (wy - cy*ch) * cs, w * cs, h * cs))
+                x += w
+            y += h
+        self._render_minimap(x0, y0)
+
+    def _render_minimap(self, x0, y0):
+        mw, mh = self.mini_counts.shape
+        pygame.surfarray.blit_array(self.minimap, self.mini_palette[(self.mini_counts > 0).view(np.uint8)])
+        if self.food:
+            self.minimap.set_at((self.food[0] * mw // self.cols, self.food[1] * mh // self.rows), RED)
+        view = pygame.Rect((x0 % self.cols) * mw // self.cols, (y0 % self.rows) * mh // self.rows,
+                           max(2, self.view_cols * mw // self.cols), max(2, self.view_rows * mh // self.rows))
+        pygame.draw.rect(self.minimap, YELLOW, view, 1)
+        pos = (self.surface.get_width() - mw - 10, self.surface.get_height() - mh - 10)
+        pygame.draw.rect(self.surface, (30,30,40), (pos[0]-2, pos[1]-2, mw+4, mh+4), 2)
+        self.surface.blit(self.minimap, pos)
+
+    def redraw(self, game):
+        self.cells.clear()
+        self.chunks.clear()
+        self.mini_counts[:] = 0
+        self.refs = self.bodies(game)
+        self.drawn = {key: deque(body) for key, body in self.refs.items()}
+        self.food = game.food
+        if game.food:
+            self.draw_cell(game.food, "food")
+        for key, body in self.refs.items():
+            for i, cell in enumerate(body):
+                self.draw_cell(cell, "head" if i == 0 else "body", key)
+        self.center = self.focus(game)
+        self.render_view()
+        self.changed = False
+        return [self.surface.get_rect()]
+
+    def update(self, game):
+        BoardRenderer.update(self, game)
+        center = self.focus(game)
+        if not self.changed and center == self.center:
+            return []
+        self.center = center
+        self.render_view()
+        self.changed = False
+        return [self.surface.get_rect()]
+
+class DirectionBuffer:
+    # Direction changes sampled between ticks; the next tick applies them in
+    # order so a quick turn sequence is not lost
+    def __init__(self, size=2):
+        self.queue = deque(maxlen=size)
+
+    # target is anything with a .dir: a SnakeGame or a multi-player Snake
+    def push(self, target, new_dir):
+        last = self.queue[-1] if self.queue else target.dir
+        if new_dir != last:
+            self.queue.append(new_dir)
+
+    def apply(self, target):
+        while self.queue:
+            new_dir = self.queue.popleft()
+            # Prevent reverse
+            if new_dir != target.dir and new_dir != (-target.dir[0], -target.dir[1]):
+                target.dir = new_dir
+                return
+
+    def clear(self):
+        self.queue.clear()
 
 # Button class unchanged
 class Button:
@@ -61,10 +378,8 @@ class Button:
     def draw(self, surface):
         color = NEON_PINK if self.hover else BLUE
         draw_glow_rect(surface, self.rect, color, glow_radius=8)
-        inner = pygame.Surface((self.rect.w, self.rect.h), pygame.SRCALPHA)
-        inner.fill((20,20,30,220))
-        surface.blit(inner, (self.rect.x, self.rect.y))
-        txt = self.font.render(self.label, True, (230,230,230))
+        surface.blit(surface_cache.panel(self.rect.size, (20,20,30,220)), (self.rect.x, self.rect.y))
+        txt = surface_cache.text(self.label, self.font, (230,230,230))
         surface.blit(txt, (self.rect.centerx - txt.get_width()//2, self.rect.centery - txt.get_height()//2))
 
     def handle_event(self, event):
@@ -75,7 +390,8 @@ class Button:
                 return True
         return False
 
-def main():
+def main(tracker=None, telemetry_path=None, players=1, attract=False, board_size=None, seed=None,
+         session_path=None):
     pygame.init()
     pygame.mixer.init()
     screen_w = GRID_W * CELL_SIZE + 260
@@ -94,8 +410,37 @@ def main():
     s_resume = make_sound(freq=440, duration_ms=120, volume=0.10)
     s_over = make_sound(freq=120, duration_ms=300, volume=0.16)
 
-    tracker = HandTracker()
-    game = SnakeGame(GRID_W, GRID_H, CELL_SIZE)
+    if tracker is None:
+        tracker = BackgroundTracker(hand_tracker_factory(maxHands=players, preview_size=(PREVIEW_W, PREVIEW_H),
+                                                         multi_hand=players > 1))
+
+    # Multi-player: every tracked hand (matched to a stable id across
+    # frames on the tracker thread) steers its own snake on a shared board
+    multi = players > 1
+    if multi:
+        game = MultiSnakeGame(GRID_W, GRID_H, CELL_SIZE, seed=seed)
+    elif board_size is not None:
+        # Large board: the window shows a GRID_W x GRID_H view of it
+        game = LargeSnakeGame(board_size[0], board_size[1], CELL_SIZE, seed=seed)
+    else:
+        game = SnakeGame(GRID_W, GRID_H, CELL_SIZE, seed=seed)
+
+    # Session log (single-player): every tick and restart goes through the
+    # recorder so the session can be replayed exactly
+    recorder = None
+    if session_path and not multi:
+        recorder = SessionRecorder(game, session_path)
+    sim = recorder if recorder is not None else game
+
+    # Share the tracker's telemetry so all stages land in one report
+    telemetry = getattr(tracker, "telemetry", None) or Telemetry()
+    show_hud = False
+
+    # Startup times from process start, reported once each
+    telemetry.record("to_window", time.perf_counter() - START)
+    first_frame = first_landmark = None
+    warming_drawn = False
+    tracker_idle = False
 
     panel_x = GRID_W * CELL_SIZE + 20
     score_y = 20
@@ -114,8 +459,69 @@ def main():
     instructions = [
         "Point with index finger to move",
         "Only 1 finger up = control",
-        "Esc = Exit"
+        "Esc = Exit",
+        "F3 = Latency HUD"
     ]
+    if not multi and board_size is None:
+        instructions.append("A = Autopilot")
+
+    # (index_pos, fingers, player) per hand, for the preview
+    markers = []
+
+    # Static layers are rendered once; each frame only pushes the rects that
+    # changed with display.update() unless something forces a full redraw
+    if board_size is not None and not multi:
+        board = ChunkedBoardRenderer(game.cols, game.rows, CELL_SIZE, GRID_W, GRID_H)
+    else:
+        board = BoardRenderer(GRID_W, GRID_H, CELL_SIZE)
+    px, py = panel_x, screen_h - PREVIEW_H - 16
+    static_layer = pygame.Surface((screen_w, screen_h))
+    static_layer.fill(BLACK)
+    for i, line in enumerate(instructions):
+        static_layer.blit(font_small.render(line, True, (200,200,200)), (panel_x, inst_y + i*18))
+    pygame.draw.rect(static_layer, (30,30,40), (px-2, py-2, PREVIEW_W+4, PREVIEW_H+4), 2)
+
+    # The tracker's preview buffers are reused frame after frame, so each is
+    # wrapped as a surface once (frombuffer shares the array's memory) and
+    # blitted straight from there. Trackers without a preview buffer fall
+    # back to converting the frame into preview_surf.
+    preview_surfs = {}
+    preview_surf = pygame.Surface((PREVIEW_W, PREVIEW_H))
+
+    def preview_surface(preview):
+        entry = preview_surfs.get(id(preview))
+        if entry is None or entry[0] is not preview:
+            entry = preview_surfs[id(preview)] = (preview, pygame.image.frombuffer(preview, (PREVIEW_W, PREVIEW_H), "RGB"))
+        return entry[1]
+
+    score_rect = pygame.Rect(panel_x, score_y, 220, 64)
+    score_area = score_rect.inflate(8, 8)
+    preview_area = pygame.Rect(px-8, py-8, PREVIEW_W+16, PREVIEW_H+16)
+    buttons = [btn_new, btn_pause, btn_exit]
+    drawn_score = None
+    drawn_hover = None
+    drawn_preview = None
+    hud_rect = None
+    full_redraw = True
+    view_state = None
+
+    # Fixed timestep: the game ticks at GAME_SPEED while input and rendering
+    # run at FPS
+    tick_dt = 1.0 / GAME_SPEED
+    dir_buffers = {}  # player id (0 in single-player) -> DirectionBuffer
+
+    def steer_target(pid):
+        if not multi:
+            return game
+        snake = game.snakes.get(pid)
+        return snake if snake is not None and snake.alive else None
+    accumulator = 0.0
+    last_time = time.perf_counter()
+
+    # Attract mode: the autopilot steers (single-player, normal board only)
+    # and a new game starts as soon as one ends
+    autopilot = Autopilot(GRID_W, GRID_H) if not multi and board_size is None else None
+    attract = attract and autopilot is not None
 
     running = True
     while running:
@@ -126,14 +532,21 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 if event.key == pygame.K_n:
-                    game.reset()
+                    sim.reset()
+                    dir_buffers.clear()
                     s_click.play()
                 if event.key == pygame.K_p:
                     game.paused = not game.paused
                     (s_pause if game.paused else s_resume).play()
+                if event.key == pygame.K_F3:
+                    show_hud = not show_hud
+                if event.key == pygame.K_a and autopilot is not None:
+                    attract = not attract
+                    dir_buffers.clear()
 
             if btn_new.handle_event(event):
-                game.reset()
+                sim.reset()
+                dir_buffers.clear()
                 s_click.play()
             if btn_pause.handle_event(event):
                 game.paused = not game.paused
@@ -141,109 +554,236 @@ def main():
             if btn_exit.handle_event(event):
                 running = False
 
-        frame, hands = tracker.read_frame()
+        t = time.perf_counter()
+        seq, frame, landmarks = tracker.read_latest()
         if frame is None:
+            # Camera and model still warming up: show the board once and hold
+            # the game clock until frames arrive
+            if not warming_drawn:
+                warming_drawn = True
+                screen.blit(static_layer, (0, 0))
+                board.redraw(game)
+                screen.blit(board.surface, (0, 0))
+                screen.blit(font_med.render("Warming up...", True, (200,200,200)), (px + 12, py + PREVIEW_H//2 - 12))
+                pygame.display.flip()
+            last_time = time.perf_counter()
+            clock.tick(FPS)
             continue
-
-        index_pos, fingers_up = tracker.get_index_and_fingers(hands)
-
-        # === IMPROVED DIRECTION CONTROL ===
-        if (index_pos is not None and fingers_up == 1 and 
-            not game.game_over and not game.paused):
-
-            ix, iy = index_pos
-            cx, cy = CAM_W // 2, CAM_H // 2
-            dx = ix - cx
-            dy = iy - cy
-
-            threshold = 30 
-
-            if abs(dx) > threshold or abs(dy) > threshold:
-                if abs(dx) > abs(dy):
-                    new_dir = (-1, 0) if dx < 0 else (1, 0)
-                else:
-                    new_dir = (0, -1) if dy < 0 else (0, 1)
-
-                # Prevent reverse
-                if new_dir != (-game.dir[0], -game.dir[1]):
-                    game.dir = new_dir
-
-        prev_score = game.score
-        game.step()
-        if game.score != prev_score:
-            s_eat.play()
-        if game.game_over and prev_score == game.score:
-            s_over.play()
-
-        screen.fill(BLACK)
-
-        area_surf = pygame.Surface((GRID_W*CELL_SIZE, GRID_H*CELL_SIZE))
-        area_surf.fill((10,10,14))
-
-        for x in range(GRID_W):
-            pygame.draw.line(area_surf, (18,18,26), (x*CELL_SIZE, 0), (x*CELL_SIZE, GRID_H*CELL_SIZE))
-        for y in range(GRID_H):
-            pygame.draw.line(area_surf, (18,18,26), (0, y*CELL_SIZE), (GRID_W*CELL_SIZE, y*CELL_SIZE))
-
-        if game.food:
-            fx, fy = game.food
-            pygame.draw.rect(area_surf, RED, (fx*CELL_SIZE+2, fy*CELL_SIZE+2, CELL_SIZE-4, CELL_SIZE-4), border_radius=6)
-
-        for i, (sx, sy) in enumerate(game.snake):
-            color = (120,200,255) if i == 0 else (80,255,140)
-            pygame.draw.rect(area_surf, color, (sx*CELL_SIZE+2, sy*CELL_SIZE+2, CELL_SIZE-4, CELL_SIZE-4), border_radius=6)
-            if i == 0:
-                pygame.draw.rect(area_surf, (230,230,255,30), (sx*CELL_SIZE+2, sy*CELL_SIZE+2, CELL_SIZE-4, CELL_SIZE-4), border_radius=6)
-
-        screen.blit(area_surf, (0,0))
-
-        # Score
-        score_rect = (panel_x, score_y, 220, 64)
-        draw_glow_rect(screen, score_rect, (120,255,200), glow_radius=3)
-        pygame.draw.rect(screen, (18,18,26), score_rect, border_radius=5)
-        screen.blit(font_big.render(f"Score: {game.score}", True, (240,240,240)), (panel_x + 12, score_y + 18))
-
-     
-
-        btn_new.draw(screen)
-        btn_pause.draw(screen)
-        btn_exit.draw(screen)
-
-        for i, line in enumerate(instructions):
-            screen.blit(font_small.render(line, True, (200,200,200)), (panel_x, inst_y + i*18))
-
-        # Preview
-        preview = cv2.resize(frame, (PREVIEW_W, PREVIEW_H))
-        preview = cv2.cvtColor(preview, cv2.COLOR_BGR2RGB)
-        surf = pygame.image.frombuffer(preview.tobytes(), (PREVIEW_W, PREVIEW_H), "RGB")
-        px, py = panel_x, screen_h - PREVIEW_H - 16
-        screen.blit(surf, (px, py))
-        pygame.draw.rect(screen, (30,30,40), (px-2, py-2, PREVIEW_W+4, PREVIEW_H+4), 2)
-
-        # Index dot
-        if index_pos and fingers_up == 1:
-            dx = int((index_pos[0] / CAM_W) * PREVIEW_W)
-            dy = int((index_pos[1] / CAM_H) * PREVIEW_H)
-            pygame.draw.circle(screen, YELLOW, (px + dx, py + dy), 6)
-
-            # Direction arrow
-            arrow_len = 30
-            center = (px + PREVIEW_W//2, py + PREVIEW_H//2)
-            end = (center[0] + game.dir[0] * arrow_len, center[1] + game.dir[1] * arrow_len)
-            pygame.draw.line(screen, YELLOW, center, end, 4)
-            pygame.draw.circle(screen, YELLOW, end, 8)
-
-        if game.paused:
+        if first_frame is None:
+            first_frame = t - START
+            telemetry.record("to_frame", first_frame)
+            print(f"time to first frame: {first_frame * 1000:.0f} ms")
+        if len(landmarks) and first_landmark is None:
+            first_landmark = t - START
+            telemetry.record("to_landmark", first_landmark)
+            print(f"time to first landmark: {first_landmark * 1000:.0f} ms")
+        t = telemetry.lap("read", t)
+
+        # Gestures are decoded on the tracker thread; apply every event
+        # since the last frame so none are lost between ticks
+        events = tracker.drain_events()
+        if not multi:
+            for event in events:
+                markers = [(event.index_pos, event.fingers, 0)]
+                if event.direction is not None and not game.game_over and not game.paused and not attract:
+                    dir_buffers.setdefault(0, DirectionBuffer()).push(game, event.direction)
+        else:
+            # One event per hand per frame, keyed by the hand's stable id
+            for _, frame_events in itertools.groupby(events, key=lambda e: e.seq):
+                frame_events = [e for e in frame_events if e.player is not None]
+                markers = [(e.index_pos, e.fingers, e.player) for e in frame_events]
+                active = {e.player for e in frame_events}
+                for event in frame_events:
+                    pid = event.player
+                    if not game.paused and pid not in game.snakes and game.claim_snake(pid, players, active) is not None:
+                        for old in [p for p in dir_buffers if p not in game.snakes]:
+                            del dir_buffers[old]
+                    target = steer_target(pid)
+                    if event.direction is not None and target is not None and not game.paused:
+                        dir_buffers.setdefault(pid, DirectionBuffer()).push(target, event.direction)
+        t = telemetry.lap("decode", t)
+
+        now = time.perf_counter()
+        accumulator += now - last_time
+        last_time = now
+        ticks = 0
+        while accumulator >= tick_dt and ticks < MAX_CATCHUP:
+            accumulator -= tick_dt
+            ticks += 1
+            if attract and game.game_over:
+                sim.reset()
+            if game.game_over or game.paused:
+                continue
+            if attract:
+                game.dir = autopilot(game)
+            for pid, buf in dir_buffers.items():
+                target = steer_target(pid)
+                if target is not None:
+                    buf.apply(target)
+            prev_score = game.score
+            sim.step()
+            if game.score != prev_score:
+                s_eat.play()
+            if game.game_over:
+                s_over.play()
+        if ticks == MAX_CATCHUP:
+            accumulator = min(accumulator, tick_dt)
+
+        # Nothing to steer: let an adaptive tracker drop to its idle rate
+        idle = game.paused or game.game_over
+        if idle != tracker_idle and hasattr(tracker, "set_idle"):
+            tracker.set_idle(idle)
+            tracker_idle = idle
+        if ticks:
+            t = telemetry.lap("step", t)
+
+        # Pause overlay and HUD toggles change the whole picture
+        if (game.paused, show_hud) != view_state:
+            view_state = (game.paused, show_hud)
+            full_redraw = True
+
+        if full_redraw:
+            screen.blit(static_layer, (0, 0))
+            board.redraw(game)
+            screen.blit(board.surface, (0, 0))
+            drawn_score = drawn_hover = drawn_preview = None
+        dirty = board.update(game)
+        for r in dirty:
+            screen.blit(board.surface, r, r)
+
+        if game.paused and full_redraw:
             overlay = pygame.Surface((GRID_W*CELL_SIZE, GRID_H*CELL_SIZE), pygame.SRCALPHA)
             overlay.fill((8, 12, 18, 180))
             screen.blit(overlay, (0,0))
             neon_text(screen, "PAUSED", font_big, (GRID_W*CELL_SIZE//2 - 80, GRID_H*CELL_SIZE//2 - 22), (200,240,255))
 
-        pygame.display.flip()
+        # Score
+        if game.score != drawn_score:
+            drawn_score = game.score
+            screen.blit(static_layer, score_area, score_area)
+            draw_glow_rect(screen, score_rect, (120,255,200), glow_radius=3)
+            pygame.draw.rect(screen, (18,18,26), score_rect, border_radius=5)
+            screen.blit(surface_cache.text(f"Score: {game.score}", font_big, (240,240,240)), (panel_x + 12, score_y + 18))
+            dirty.append(score_area)
+
+        hover = tuple(b.hover for b in buttons)
+        if hover != drawn_hover:
+            drawn_hover = hover
+            for b in buttons:
+                area = b.rect.inflate(16, 16)
+                screen.blit(static_layer, area, area)
+                b.draw(screen)
+                dirty.append(area)
+
+        # Preview: only redrawn for a new camera frame or when the markers
+        # or the direction arrow change
+        preview_state = (seq, tuple(markers), None if multi else game.dir)
+        if preview_state != drawn_preview:
+            drawn_preview = preview_state
+            screen.blit(static_layer, preview_area, preview_area)
+            preview = tracker.preview() if hasattr(tracker, "preview") else None
+            if preview is not None:
+                screen.blit(preview_surface(preview), (px, py))
+            else:
+                import cv2  # only trackers without a preview buffer land here
+                rgb = cv2.cvtColor(cv2.resize(frame, (PREVIEW_W, PREVIEW_H)), cv2.COLOR_BGR2RGB)
+                pygame.surfarray.blit_array(preview_surf, rgb.swapaxes(0, 1))
+                screen.blit(preview_surf, (px, py))
+            pygame.draw.rect(screen, (30,30,40), (px-2, py-2, PREVIEW_W+4, PREVIEW_H+4), 2)
+
+            # Index dots (one per hand, in the player's color when multi-player)
+            for index_pos, fingers_up, pid in markers:
+                if not index_pos or fingers_up != 1:
+                    continue
+                dx = int((index_pos[0] / CAM_W) * PREVIEW_W)
+                dy = int((index_pos[1] / CAM_H) * PREVIEW_H)
+                color = PLAYER_COLORS[pid % len(PLAYER_COLORS)][0] if multi else YELLOW
+                pygame.draw.circle(screen, color, (px + dx, py + dy), 6)
+                if multi:
+                    continue
+
+                # Direction arrow
+                arrow_len = 30
+                center = (px + PREVIEW_W//2, py + PREVIEW_H//2)
+                end = (center[0] + game.dir[0] * arrow_len, center[1] + game.dir[1] * arrow_len)
+                pygame.draw.line(screen, YELLOW, center, end, 4)
+                pygame.draw.circle(screen, YELLOW, end, 8)
+            dirty.append(preview_area)
+
+        if show_hud:
+            if hud_rect and not game.paused:
+                screen.blit(board.surface, hud_rect, hud_rect)
+            cache = surface_cache.stats()
+            lines = telemetry.hud_lines() + [f"surfaces   {cache['size']} cached  {cache['hits']} hits  {cache['misses']} misses"]
+            hud_rect = pygame.Rect(6, 6, 0, 0)
+            for i, line in enumerate(lines):
+                img = font_small.render(line, True, YELLOW, BLACK)
+                hud_rect.union_ip(screen.blit(img, (6, 6 + i*18)))
+            dirty.append(hud_rect.copy())
+        else:
+            hud_rect = None
+        t = telemetry.lap("render", t)
+
+        if full_redraw:
+            pygame.display.flip()
+            full_redraw = False
+        else:
+            pygame.display.update(dirty)
+        telemetry.lap("present", t)
         clock.tick(FPS)
 
     tracker.release()
+    if recorder is not None:
+        recorder.close()
+    if telemetry_path:
+        telemetry.export(telemetry_path)
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Hand Controlled Snake Game")
+    parser.add_argument("--record", help="save per-frame landmarks to this file")
+    parser.add_argument("--replay", help="play back a landmark file instead of using the camera")
+    parser.add_argument("--process", action="store_true", help="run hand inference in a separate process")
+    parser.add_argument("--roi", action="store_true", help="run hand inference on a crop around the last hand")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="run the model on keyframes only, optical flow in between, idle rate when paused")
+    parser.add_argument("--infer-size", type=int, help="downscale the inference image to this longest side")
+    parser.add_argument("--players", type=int, default=1, help="one snake per tracked hand, up to this many")
+    parser.add_argument("--board", help="large single-player board, e.g. 1000x1000, shown through a scrolling view")
+    parser.add_argument("--filter", choices=("ema", "one_euro"), default="ema", help="index fingertip smoothing")
+    parser.add_argument("--autopilot", action="store_true", help="start in attract mode (A toggles it)")
+    parser.add_argument("--seed", type=int, help="seed for food placement")
+    parser.add_argument("--session-log", help="log every tick's input to this file (see session_log.py)")
+    parser.add_argument("--telemetry", help="write per-stage latency percentiles on exit (.csv or .jsonl)")
+    args = parser.parse_args()
+    board_size = None
+    if args.board:
+        parts = args.board.lower().split("x")
+        if len(parts) != 2 or not all(p.isdigit() and int(p) > 0 for p in parts):
+            parser.error("--board takes COLSxROWS, e.g. 1000x1000")
+        if args.players > 1:
+            parser.error("--board is single-player only")
+        board_size = (int(parts[0]), int(parts[1]))
+    if args.process:
+        # The worker process only runs plain full-frame inference
+        unsupported = [flag for flag, used in (("--record", args.record), ("--roi", args.roi),
+                                               ("--infer-size", args.infer_size), ("--adaptive", args.adaptive))
+                       if used]
+        if unsupported:
+            parser.error(f"--process does not support {', '.join(unsupported)}")
+
+    if args.replay:
+        factory = replay_tracker_factory(args.replay, paced=True, preview_size=(PREVIEW_W, PREVIEW_H),
+                                         filter=args.filter, multi_hand=args.players > 1)
+    elif args.process:
+        factory = process_tracker_factory(maxHands=args.players, preview_size=(PREVIEW_W, PREVIEW_H),
+                                          filter=args.filter, multi_hand=args.players > 1)
+    else:
+        factory = hand_tracker_factory(maxHands=args.players, record_path=args.record, roi=args.roi,
+                                       infer_size=args.infer_size, adaptive=args.adaptive,
+                                       preview_size=(PREVIEW_W, PREVIEW_H),
+                                       filter=args.filter, multi_hand=args.players > 1)
+    # The tracker loads in the background while the window comes up
+    tracker = BackgroundTracker(factory)
+    main(tracker, telemetry_path=args.telemetry, players=args.players, attract=args.autopilot,
+         board_size=board_size, seed=args.seed, session_path=args.session_log)
\ No newline at end of file
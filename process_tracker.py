@@ -0,0 +1,309 @@
+# process_tracker.py
+# HandTracker variant that runs MediaPipe in a separate process so its
+# pre/post-processing does not compete with the pygame loop for the GIL.
+# Frames go to the worker through a multiprocessing.shared_memory ring,
+# landmarks come back through a small shared array; only slot numbers
+# travel over the pipe.
+import argparse
+import multiprocessing as mp
+import threading
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from frame_sources import WebcamSource, CAM_W, CAM_H
+from gestures import GestureDecoder, hand_features
+from telemetry import Telemetry
+
+# Slot roles: being written, waiting for the worker, in the worker,
+# published, held by the reader
+RING = 5
+NUM_LANDMARKS = 21
+
+def result_width(max_hands):
+    # [hand count, process seconds, landmarks...]
+    return 2 + max_hands * NUM_LANDMARKS * 3
+
+def inference_worker(conn, names, shape, max_hands, detection_con, preview_size):
+    import mediapipe as mp_solutions
+
+    frames_shm = shared_memory.SharedMemory(name=names[0])
+    results_shm = shared_memory.SharedMemory(name=names[1])
+    frames = np.ndarray((RING,) + shape, dtype=np.uint8, buffer=frames_shm.buf)
+    results = np.ndarray((RING, result_width(max_hands)), dtype=np.float32, buffer=results_shm.buf)
+    previews = None
+    if preview_size is not None:
+        preview_shm = shared_memory.SharedMemory(name=names[2])
+        previews = np.ndarray((RING, preview_size[1], preview_size[0], 3), dtype=np.uint8, buffer=preview_shm.buf)
+
+    hands = mp_solutions.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=max_hands,
+        min_detection_confidence=detection_con,
+        min_tracking_confidence=0.7
+    )
+    rgb_frame = np.empty(shape, dtype=np.uint8)
+    conn.send("ready")
+    try:
+        while True:
+            slot = conn.recv()
+            if slot is None:
+                break
+            cv2.cvtColor(frames[slot], cv2.COLOR_BGR2RGB, dst=rgb_frame)
+            if previews is not None:
+                cv2.resize(rgb_frame, preview_size, dst=previews[slot])
+            t = time.perf_counter()
+            found = hands.process(rgb_frame).multi_hand_landmarks or []
+            row = results[slot]
+            n = min(len(found), max_hands)
+            row[0] = n
+            row[1] = time.perf_counter() - t
+            pts = row[2:].reshape(max_hands, NUM_LANDMARKS, 3)
+            for h in range(n):
+                pts[h] = [(lm.x, lm.y, lm.z) for lm in found[h].landmark]
+            conn.send(slot)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        hands.close()
+        del frames, results, previews
+        frames_shm.close()
+        results_shm.close()
+        if preview_size is not None:
+            preview_shm.close()
+
+class ProcessHandTracker(GestureDecoder):
+    # Same read_latest/read_frame/read_hands/preview/get_index_and_fingers/
+    # drain_events/release interface as HandTracker
+    def __init__(self, maxHands=1, detectionCon=0.7, smoothing_alpha=0.4, source=None,
+                 telemetry=None, preview_size=None, **filter_args):
+        GestureDecoder.__init__(self, smoothing_alpha, (CAM_W, CAM_H), **filter_args)
+        self.cap = source if source is not None else WebcamSource(0, CAM_W, CAM_H)
+        self.telemetry = telemetry if telemetry is not None else Telemetry()
+        self.max_hands = maxHands
+        self.preview_size = preview_size
+
+        # The first frame fixes the ring's frame shape
+        success, frame = self.cap.read()
+        while not success and not getattr(self.cap, "eof", False):
+            success, frame = self.cap.read()
+        shape = frame.shape if success else (CAM_H, CAM_W, 3)
+
+        self.shms = [
+            shared_memory.SharedMemory(create=True, size=RING * int(np.prod(shape))),
+            shared_memory.SharedMemory(create=True, size=RING * result_width(maxHands) * 4),
+        ]
+        if preview_size is not None:
+            self.shms.append(shared_memory.SharedMemory(create=True, size=RING * preview_size[0] * preview_size[1] * 3))
+        self.frames = np.ndarray((RING,) + shape, dtype=np.uint8, buffer=self.shms[0].buf)
+        self.results = np.ndarray((RING, result_width(maxHands)), dtype=np.float32, buffer=self.shms[1].buf)
+        self.views = [self._readonly(self.frames[i]) for i in range(RING)]
+        self.preview_views = None
+        if preview_size is not None:
+            previews = np.ndarray((RING, preview_size[1], preview_size[0], 3), dtype=np.uint8, buffer=self.shms[2].buf)
+            self.preview_views = [self._readonly(previews[i]) for i in range(RING)]
+
+        ctx = mp.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe()
+        self.worker = ctx.Process(
+            target=inference_worker,
+            args=(child_conn, [s.name for s in self.shms], shape, maxHands, detectionCon, preview_size),
+            daemon=True,
+        )
+        self.worker.start()
+        child_conn.close()
+
+        self.lock = threading.Lock()
+        self.writing = self.pending = self.busy = self.published = self.reading = None
+        self.pending_t = self.busy_t = None
+        self.seq = 0
+        self.landmarks = np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.features = hand_features(self.landmarks, (CAM_W, CAM_H))
+        self.slot_times = [0.0] * RING
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.capture_dropped = 0
+        self.frames_unread = 0
+        self.last_read_seq = 0
+
+        self.running = True
+        self.result_thread = threading.Thread(target=self.result_loop, daemon=True)
+        self.capture_thread = threading.Thread(target=self.capture_loop, args=(frame if success else None,), daemon=True)
+        self.result_thread.start()
+        self.capture_thread.start()
+
+    @staticmethod
+    def _readonly(array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def _dispatch(self):
+        # Called with the lock held: hand the newest frame to an idle worker
+        if self.busy is None and self.pending is not None:
+            self.busy, self.busy_t = self.pending, self.pending_t
+            self.pending = None
+            self.conn.send(self.busy)
+
+    def capture_loop(self, first_frame):
+        tel = self.telemetry
+        frame = first_frame
+        while self.running:
+            t0 = time.perf_counter()
+            if frame is None:
+                success, frame = self.cap.read()
+                if not success:
+                    frame = None
+                    if getattr(self.cap, "eof", False):
+                        break
+                    continue
+            t_captured = tel.lap("capture", t0)
+            with self.lock:
+                taken = (self.pending, self.busy, self.published, self.reading)
+                self.writing = next(i for i in range(RING) if i not in taken)
+            cv2.flip(frame, 1, dst=self.frames[self.writing])
+            frame = None
+            self.frames_captured += 1
+            with self.lock:
+                if self.pending is not None:
+                    self.capture_dropped += 1
+                self.pending, self.pending_t = self.writing, t_captured
+                self.writing = None
+                self._dispatch()
+
+    def result_loop(self):
+        tel = self.telemetry
+        while self.running:
+            if not self.conn.poll(0.1):
+                continue
+            try:
+                msg = self.conn.recv()
+            except EOFError:
+                break
+            if msg == "ready":
+                continue
+            slot = msg
+            row = self.results[slot]
+            n = int(row[0])
+            tel.record("process", float(row[1]))
+            t = tel.lap("roundtrip", self.busy_t)
+            landmarks = row[2:].reshape(self.max_hands, NUM_LANDMARKS, 3)[:n].copy()
+            landmarks.flags.writeable = False
+            features = hand_features(landmarks, (CAM_W, CAM_H))
+            t_captured = self.busy_t
+            with self.lock:
+                self.published = slot
+                self.landmarks = landmarks
+                self.features = features
+                self.seq += 1
+                seq = self.seq
+                self.busy = None
+                self._dispatch()
+            self.frames_processed += 1
+            tel.lap("post", t)
+            t = time.perf_counter()
+            self.decode_event(features, seq, t_captured)
+            tel.lap("gesture", t)
+
+    def read_latest(self):
+        with self.lock:
+            if self.published is None:
+                return self.seq, None, self.landmarks
+            self.reading = self.published
+            if self.seq > self.last_read_seq:
+                self.frames_unread += self.seq - self.last_read_seq - 1
+                self.last_read_seq = self.seq
+            return self.seq, self.views[self.reading], self.landmarks
+
+    def read_frame(self):
+        _, frame, landmarks = self.read_latest()
+        return frame, landmarks
+
+    def read_hands(self):
+        with self.lock:
+            return self.seq, self.landmarks, self.features
+
+    def preview(self):
+        with self.lock:
+            if self.preview_views is None or self.reading is None:
+                return None
+            return self.preview_views[self.reading]
+
+    def drop_stats(self):
+        return {
+            "captured": self.frames_captured,
+            "capture_dropped": self.capture_dropped,
+            "processed": self.frames_processed,
+            "inference_dropped": self.frames_unread,
+        }
+
+    def release(self):
+        self.running = False
+        self.capture_thread.join()
+        try:
+            with self.lock:
+                self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.worker.join(timeout=5)
+        if self.worker.is_alive():
+            self.worker.terminate()
+            self.worker.join()
+        self.result_thread.join()
+        self.conn.close()
+        self.cap.release()
+        # Views into the shared blocks must go before the blocks can close
+        self.frames = self.results = self.views = self.preview_views = None
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+
+def benchmark(make_tracker, seconds, busy_ms):
+    # Simulated game loop: busy_ms of pure-Python work per frame at up to
+    # 60 Hz, so GIL contention with the tracker shows up as frame time
+    tracker = make_tracker()
+    while tracker.read_latest()[1] is None:
+        time.sleep(0.01)
+    start = tracker.frames_processed
+    frame_times = []
+    t_end = time.perf_counter() + seconds
+    while time.perf_counter() < t_end:
+        t0 = time.perf_counter()
+        tracker.read_latest()
+        tracker.drain_events()
+        x = 0
+        while time.perf_counter() - t0 < busy_ms / 1000:
+            x += 1
+        frame_times.append(time.perf_counter() - t0)
+        time.sleep(max(0.0, 1 / 60 - frame_times[-1]))
+    processed = tracker.frames_processed - start
+    tracker.release()
+    ft = sorted(frame_times)
+    return {
+        "inference_fps": processed / seconds,
+        "loop_p50_ms": 1000 * ft[len(ft) // 2],
+        "loop_p99_ms": 1000 * ft[int(len(ft) * 0.99)],
+    }
+
+def main():
+    from frame_sources import SyntheticSource, VideoFileSource
+    from hand_tracker import HandTracker
+
+    parser = argparse.ArgumentParser(description="Compare thread and process tracker modes")
+    parser.add_argument("--video", help="video clip to use instead of synthetic frames")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--busy-ms", type=float, default=8.0, help="simulated main-loop work per frame")
+    args = parser.parse_args()
+
+    def source():
+        if args.video:
+            return VideoFileSource(args.video, paced=True, loop=True)
+        return SyntheticSource(paced=True, fps=30, loop=True)
+
+    for name, cls in (("thread", HandTracker), ("process", ProcessHandTracker)):
+        r = benchmark(lambda: cls(source=source()), args.seconds, args.busy_ms)
+        print(f"{name:<8} inference {r['inference_fps']:6.1f} fps   "
+              f"loop p50 {r['loop_p50_ms']:6.2f} ms   p99 {r['loop_p99_ms']:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# render.py
+# Full-board drawing shared by main.py and headless.py. Needs only pygame,
+# so headless rendering never imports main.py or the camera stack.
+import pygame
+
+RED = (255,60,80)
+
+def draw_board(area_surf, game):
+    cols, rows, cs = game.cols, game.rows, game.cell
+    area_surf.fill((10,10,14))
+
+    for x in range(cols):
+        pygame.draw.line(area_surf, (18,18,26), (x*cs, 0), (x*cs, rows*cs))
+    for y in range(rows):
+        pygame.draw.line(area_surf, (18,18,26), (0, y*cs), (cols*cs, y*cs))
+
+    if game.food:
+        fx, fy = game.food
+        pygame.draw.rect(area_surf, RED, (fx*cs+2, fy*cs+2, cs-4, cs-4), border_radius=6)
+
+    for i, (sx, sy) in enumerate(game.snake):
+        color = (120,200,255) if i == 0 else (80,255,140)
+        pygame.draw.rect(area_surf, color, (sx*cs+2, sy*cs+2, cs-4, cs-4), border_radius=6)
+        if i == 0:
+            pygame.draw.rect(area_surf, (230,230,255,30), (sx*cs+2, sy*cs+2, cs-4, cs-4), border_radius=6)
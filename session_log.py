@@ -0,0 +1,186 @@
+# session_log.py
+# Compact per-tick input log of a SnakeGame session, plus a replayer that
+# rebuilds any tick from the nearest snapshot. Only direction changes and
+# resets are stored, each as a kind byte and a varint tick delta; every
+# snapshot_every ticks a zlib-compressed game.snapshot() is written too.
+# The game's own RNG makes the rest deterministic.
+import bisect
+import json
+import struct
+import time
+import zlib
+from game import SnakeGame, LargeSnakeGame
+
+MAGIC = b"SNK1"
+HEADER = struct.Struct("<4sIIIB3x")  # magic, cols, rows, snapshot_every, large board
+DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIR_INDEX = {d: i for i, d in enumerate(DIRS)}
+EV_DIR, EV_RESET, EV_SNAPSHOT = b"D"[0], b"R"[0], b"S"[0]
+
+def write_varint(buf, n):
+    while n >= 0x80:
+        buf.append(n & 0x7F | 0x80)
+        n >>= 7
+    buf.append(n)
+
+def read_varint(data, pos):
+    n = shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+def encode_snapshot(state):
+    return zlib.compress(json.dumps(state, separators=(",", ":")).encode())
+
+def decode_snapshot(blob):
+    return json.loads(zlib.decompress(blob))
+
+class SessionRecorder:
+    # Stands in for the game's step()/reset() at the call sites so every
+    # tick and restart is logged; game.dir is read right before each step
+    def __init__(self, game, path, snapshot_every=1000):
+        self.game = game
+        self.snapshot_every = snapshot_every
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, game.cols, game.rows, snapshot_every,
+                                 isinstance(game, LargeSnakeGame)))
+        self.buf = bytearray()
+        self.tick = 0
+        self.last_tick = 0
+        self.last_dir = None
+
+    def _event(self, kind):
+        self.buf.append(kind)
+        write_varint(self.buf, self.tick - self.last_tick)
+        self.last_tick = self.tick
+
+    def _snapshot(self):
+        blob = encode_snapshot(self.game.snapshot())
+        self._event(EV_SNAPSHOT)
+        write_varint(self.buf, len(blob))
+        self.buf += blob
+        self.f.write(self.buf)
+        self.buf.clear()
+
+    def step(self):
+        if self.tick % self.snapshot_every == 0:
+            self._snapshot()
+        if self.game.dir != self.last_dir:
+            self._event(EV_DIR)
+            self.buf.append(DIR_INDEX[self.game.dir])
+            self.last_dir = self.game.dir
+        self.game.step()
+        self.tick += 1
+
+    def reset(self):
+        self.game.reset()
+        self._event(EV_RESET)
+        self.last_dir = None
+
+    def close(self):
+        # A final snapshot lets the replayer check it ends in the same state
+        if not self.f.closed:
+            self._snapshot()
+            self.f.close()
+
+class SessionReplayer:
+    def __init__(self, path, cell_size=24):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, cols, rows, self.snapshot_every, large = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"Not a session log: {path}")
+
+        # events: (tick, kind, payload) in file order; snapshots are indexed
+        # by tick for seek()
+        self.events = []
+        self.snap_ticks = []
+        self.snap_pos = []
+        pos, tick = HEADER.size, 0
+        while pos < len(data):
+            kind = data[pos]
+            delta, pos = read_varint(data, pos + 1)
+            tick += delta
+            payload = None
+            if kind == EV_DIR:
+                payload = DIRS[data[pos]]
+                pos += 1
+            elif kind == EV_SNAPSHOT:
+                n, pos = read_varint(data, pos)
+                payload = data[pos:pos + n]
+                pos += n
+                self.snap_ticks.append(tick)
+                self.snap_pos.append(len(self.events))
+            self.events.append((tick, kind, payload))
+        if not self.snap_ticks:
+            raise ValueError(f"Session log has no snapshot: {path}")
+        self.ticks = tick
+
+        game_cls = LargeSnakeGame if large else SnakeGame
+        self.game = game_cls(cols, rows, cell_size, seed=0)
+        self.tick = None
+
+    def seek(self, tick):
+        # Game state after `tick` steps: restore the nearest snapshot at or
+        # before it, then re-simulate the logged inputs up to it
+        tick = max(0, min(tick, self.ticks))
+        i = bisect.bisect_right(self.snap_ticks, tick) - 1
+        start = self.snap_pos[i]
+        self.game.restore(decode_snapshot(self.events[start][2]))
+        self.tick = self.events[start][0]
+        self._play(start + 1, tick)
+        return self.game
+
+    def _play(self, start, tick):
+        # Events logged at `tick` belong to it (a reset at tick T comes
+        # before the snapshot step() takes at T), so they are applied too
+        game = self.game
+        t = self.tick
+        for ev_tick, kind, payload in self.events[start:]:
+            if ev_tick > tick:
+                break
+            while t < ev_tick:
+                game.step()
+                t += 1
+            if kind == EV_DIR:
+                game.dir = payload
+            elif kind == EV_RESET:
+                game.reset()
+        while t < tick:
+            game.step()
+            t += 1
+        self.tick = t
+
+    def run(self):
+        # Re-simulate the whole session from the first snapshot as fast as
+        # possible. Stats have the same shape as headless.run_headless, plus
+        # whether the state re-simulated up to every later snapshot matches
+        # it, i.e. seek() gives the same state whichever snapshot it starts
+        # from (None if the log has only one snapshot).
+        t0 = time.perf_counter()
+        first = self.snap_pos[0]
+        self.game.restore(decode_snapshot(self.events[first][2]))
+        self.tick = self.events[first][0]
+        game = self.game
+        matches = None
+        prev = first
+        for pos, snap_tick in zip(self.snap_pos[1:], self.snap_ticks[1:]):
+            self._play(prev + 1, snap_tick)
+            state = json.loads(json.dumps(game.snapshot()))
+            matches = (matches is not False) and state == decode_snapshot(self.events[pos][2])
+            prev = pos
+        self._play(prev + 1, self.ticks)
+        elapsed = time.perf_counter() - t0
+        return {
+            "ticks": self.ticks,
+            "seconds": elapsed,
+            "ticks_per_s": self.ticks / elapsed if elapsed > 0 else float("inf"),
+            "games": 1 + sum(1 for _, kind, _ in self.events if kind == EV_RESET),
+            "score": game.score,
+            "length": len(game.snake),
+            "matches": matches,
+        }
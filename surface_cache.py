@@ -0,0 +1,57 @@
+# surface_cache.py
+# Size-bounded LRU cache of pre-rendered pygame surfaces (text, outlined
+# text, glows, translucent panels), so UI redraws are plain blits.
+from collections import OrderedDict
+import pygame
+
+class SurfaceCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, make):
+        # Surface for key, built with make() on a miss; the least recently
+        # used entry is dropped once the cache is full
+        surf = self.items.get(key)
+        if surf is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = make()
+        self.items[key] = surf
+        if len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+        return surf
+
+    def text(self, text, font, color, background=None):
+        return self.get(("text", text, font, color, background),
+                        lambda: font.render(text, True, color, background))
+
+    def outlined_text(self, text, font, color, outline=3, outline_color=(10,10,10)):
+        # Text over four offset copies in outline_color; blit it at
+        # (x - outline, y - outline)
+        def make():
+            edge = font.render(text, True, outline_color)
+            w, h = edge.get_size()
+            surf = pygame.Surface((w + 2*outline, h + 2*outline), pygame.SRCALPHA)
+            for dx, dy in [(-outline,0),(outline,0),(0,-outline),(0,outline)]:
+                surf.blit(edge, (outline + dx, outline + dy))
+            surf.blit(font.render(text, True, color), (outline, outline))
+            return surf
+        return self.get(("outlined", text, font, color, outline, outline_color), make)
+
+    def panel(self, size, color):
+        def make():
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            surf.fill(color)
+            return surf
+        return self.get(("panel", size, color), make)
+
+    def stats(self):
+        return {"size": len(self.items), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self.items.clear()
@@ -0,0 +1,72 @@
+# telemetry.py
+# Per-stage latency collection with rolling p50/p95/p99 and CSV / JSON lines
+# export. Stages from different threads can share one Telemetry.
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+STATS = ("count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, int(round(q / 100 * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+class Telemetry:
+    def __init__(self, window=1000):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        buf = self.samples.get(stage)
+        if buf is None:
+            with self.lock:
+                buf = self.samples.setdefault(stage, deque(maxlen=self.window))
+                self.counts.setdefault(stage, 0)
+        buf.append(seconds)
+        self.counts[stage] += 1
+
+    def lap(self, stage, start):
+        # Record time since start and return "now" as the next start
+        now = time.perf_counter()
+        self.record(stage, now - start)
+        return now
+
+    def stats(self, stage):
+        vals = sorted(self.samples.get(stage, ()))
+        n = len(vals)
+        return {
+            "stage": stage,
+            "count": self.counts.get(stage, 0),
+            "mean_ms": round(1000 * sum(vals) / n, 3) if n else 0.0,
+            "p50_ms": round(1000 * percentile(vals, 50), 3),
+            "p95_ms": round(1000 * percentile(vals, 95), 3),
+            "p99_ms": round(1000 * percentile(vals, 99), 3),
+            "max_ms": round(1000 * vals[-1], 3) if n else 0.0,
+        }
+
+    def summary(self):
+        with self.lock:
+            stages = list(self.samples)
+        return [self.stats(stage) for stage in stages]
+
+    def export(self, path):
+        rows = self.summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=("stage",) + STATS)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+
+    def hud_lines(self):
+        return [f"{r['stage']:<10} p50 {r['p50_ms']:5.1f}  p95 {r['p95_ms']:5.1f}  p99 {r['p99_ms']:5.1f} ms"
+                for r in self.summary()]
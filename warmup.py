@@ -0,0 +1,60 @@
+# warmup.py
+# Builds a tracker on a background thread so the game window can open at
+# once. The factory is where the heavy imports (cv2, mediapipe), the camera
+# and the model graph get loaded; until it returns, BackgroundTracker acts
+# like a tracker that has no frame yet.
+import threading
+import time
+from telemetry import Telemetry
+
+class BackgroundTracker:
+    def __init__(self, factory, telemetry=None):
+        # factory(telemetry) -> tracker
+        self.telemetry = telemetry if telemetry is not None else Telemetry()
+        self.factory = factory
+        self.tracker = None
+        self.error = None
+        self.t_start = time.perf_counter()
+        self.t_ready = None
+        self.thread = threading.Thread(target=self._load, daemon=True)
+        self.thread.start()
+
+    def _load(self):
+        try:
+            self.tracker = self.factory(self.telemetry)
+        except Exception as e:
+            self.error = e
+        self.t_ready = time.perf_counter()
+        self.telemetry.record("warmup", self.t_ready - self.t_start)
+
+    @property
+    def ready(self):
+        return self.tracker is not None
+
+    def read_latest(self):
+        if self.tracker is None:
+            if self.error is not None:
+                raise self.error
+            return 0, None, []
+        return self.tracker.read_latest()
+
+    def drain_events(self):
+        return self.tracker.drain_events() if self.tracker is not None else []
+
+    def preview(self):
+        tracker = self.tracker
+        if tracker is None or not hasattr(tracker, "preview"):
+            return None
+        return tracker.preview()
+
+    def release(self):
+        self.thread.join()
+        if self.tracker is not None:
+            self.tracker.release()
+
+    def __getattr__(self, name):
+        # Anything else (read_hands, drop_stats, ...) once the tracker exists
+        tracker = self.__dict__.get("tracker")
+        if tracker is None:
+            raise AttributeError(name)
+        return getattr(tracker, name)